@@ -1,8 +1,9 @@
 
 import argparse
+from collections import deque
 from colorama import Fore, Style
 
-from src.utils.tools import readFile, load_from_pickle
+from src.utils.tools import readFile, readChunks, load_from_pickle
 from src._dir_dfa import DirectDeterministicFiniteAutomaton as DFA
 from src._tokenizer import Tokenizer
 
@@ -39,41 +40,54 @@ def analyze(read_file_path, verb=True):
     tokenized = Tokenizer(fileContent, useExtraSoftCodify=True)
     unCodified = tokenized.unCodified
     codified = tokenized.codified
-    codified.append('#')
 
     structure: DFA = load_from_pickle(analyzer_file_path)
     vrint(f'✔ Analyzer loaded successfully from {analyzer_file_path}')
 
     vrint('-' * 10, 'ANALYSIS', '-' * 10)
 
-    forward = 0
-    while forward < len(fileContent):
-        match, idx = structure.specialSimulate(codified[forward:])
+    for match, forward, end in structure.tokens(codified):
         if match is False:
             vrint(Fore.RED + '✖ No match found!' + Style.RESET_ALL)
-            vrint(f'[{forward}:{forward+idx}]', 'No match')
+            vrint(f'[{forward}:{end}]', 'No match')
             vrint(Fore.YELLOW + 'Skipping this token...' + Style.RESET_ALL)
             vrint(Fore.RED + '-'*31)
             vrint('-'*31 + Style.RESET_ALL)
-            forward += 1
         else:
             vrint(Fore.GREEN + '✔ Match found!' + Style.RESET_ALL)
-            vrint(f'[{forward}:{forward+idx}]', match, '->', unCodified[forward:forward + idx])
-            symbolTable.append((match, unCodified[forward:forward + idx]))
+            vrint(f'[{forward}:{end}]', match, '->', unCodified[forward:end])
+            symbolTable.append((match, unCodified[forward:end]))
             vrint(Fore.YELLOW + 'Executing the attached python code...' + Style.RESET_ALL)
-            code = structure.returnDict[match][1:-1]
-            code = code.encode().decode('unicode_escape')
-            vrint(Fore.CYAN + 'Code to be executed:\n' + code + Style.RESET_ALL)
+            vrint(Fore.CYAN + 'Code to be executed:\n' + structure.actions.sources[match] + Style.RESET_ALL)
             try:
-                exec(code)
+                structure.actions.functions[match](unCodified[forward:end], forward, symbolTable)
             except Exception as e:
                 vrint(Fore.RED + 'On running return, found error:', e, Style.RESET_ALL)
-            forward += idx
             vrint(Fore.RED + '-'*31)
             vrint('-'*31 + Style.RESET_ALL)
     vrint('Analysis finished!')
     return symbolTable
 
+def stream(read_file_path, chunk_size=65536, table_size=1024):
+    analyzer_file_path = "./YALEX_ANALYZER.pkl"
+
+    structure: DFA = load_from_pickle(analyzer_file_path)
+    vrint(f'✔ Analyzer loaded successfully from {analyzer_file_path}')
+
+    # The actions get the last table_size symbols, a whole table would grow with the input
+    symbolTable = deque(maxlen=table_size)
+    for match, lexeme, offset in structure.stream(readChunks(read_file_path, chunk_size)):
+        if match is False:
+            vrint(Fore.RED + '✖ No match found!' + Style.RESET_ALL)
+            vrint(f'[{offset}]', 'No match')
+            continue
+        symbolTable.append((match, lexeme))
+        try:
+            structure.actions.functions[match](lexeme, offset, symbolTable)
+        except Exception as e:
+            vrint(Fore.RED + 'On running return, found error:', e, Style.RESET_ALL)
+        yield match, lexeme, offset
+
 def main():
     symbolTable = []
     parser = argparse.ArgumentParser(description="Lexer Analyzer")
@@ -81,6 +95,8 @@ def main():
                         help='The .txt to tokenize')  # Read from file
     parser.add_argument('verbose', type=str2bool,
                         help='A boolean flag to show the logs or not.')  # Show logs
+    parser.add_argument('--stream', action='store_true',
+                        help='Print the tokens as they are read, in bounded memory.')  # Stream mode
 
     args = parser.parse_args()
 
@@ -88,7 +104,11 @@ def main():
     verbose = args.verbose
     
     read_file_path = args.read_file_path
-    print(analyze(read_file_path, verbose))
+    if args.stream:
+        for token in stream(read_file_path):
+            print(token)
+    else:
+        print(analyze(read_file_path, verbose))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,217 @@
+"""
+Lexical analyzer generated by yalex.py.
+It is standalone: the transition table and the RETURN actions are inlined below.
+"""
+
+import argparse
+from array import array
+from bisect import bisect_right
+from collections import deque
+
+# Column of each byte code, NO_COLUMN when no transition uses it
+NO_COLUMN = 255
+COLUMNS = (
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\x00\x00\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\x00\xff\xff\xff\xff\xff\xff\xff\x01\x02\x03\x04\xff\xff\xff\xff\x06\x06\x06\x06\x06\x06\x06\x06\x06\x06\xff\xff\xff\xff\xff\xff\xff\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05'
+    b'\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\xff\xff\xff\xff\xff\xff\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\x05\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+    b'\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff'
+)
+# Column of the codes above 255, by sorted ranges WIDE_STARTS[k]..WIDE_ENDS[k]
+WIDE_STARTS = ()
+WIDE_ENDS = ()
+WIDE_COLUMNS = ()
+
+# TABLE[row * WIDTH + column] is the next row, DEAD when there is none
+DEAD = 255
+WIDTH = 7
+START = 0
+TABLE = (
+    b'\x01\x02\x03\x04\x05\x06\xff\x01\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\x06\x06\xff\xff\xff\xff\xff\xff\xff'
+)
+
+# Token accepted by each row
+ACCEPT = (None, 'ws', 'LPAREN', 'RPAREN', 'TIMES', 'PLUS', 'id', None)
+
+
+def ws_action(lexeme, position, symbolTable):
+    WS
+
+
+def id_action(lexeme, position, symbolTable):
+    ID
+
+
+def PLUS_action(lexeme, position, symbolTable):
+    PLUS
+
+
+def TIMES_action(lexeme, position, symbolTable):
+    TIMES
+
+
+def LPAREN_action(lexeme, position, symbolTable):
+    LPAREN
+
+
+def RPAREN_action(lexeme, position, symbolTable):
+    RPAREN
+
+
+ACTIONS = {
+    'ws': ws_action,
+    'id': id_action,
+    'PLUS': PLUS_action,
+    'TIMES': TIMES_action,
+    'LPAREN': LPAREN_action,
+    'RPAREN': RPAREN_action,
+}
+
+
+def str2bool(v):
+    if isinstance(v, bool):
+        return v
+    if v.lower() in ('yes', 'true', 't', 'y', '1'):
+        return True
+    elif v.lower() in ('no', 'false', 'f', 'n', '0'):
+        return False
+    else:
+        raise argparse.ArgumentTypeError('Boolean value expected.')
+
+
+verbose = True
+
+
+def vrint(*args):
+    if verbose:
+        print(*args)
+
+
+def codify(text):
+    try:
+        return text.encode('latin-1')
+    except UnicodeEncodeError:
+        return array('I', map(ord, text))
+
+
+def wide_column(code):
+    k = bisect_right(WIDE_STARTS, code) - 1
+    if k >= 0 and code <= WIDE_ENDS[k]:
+        return WIDE_COLUMNS[k]
+    return NO_COLUMN
+
+
+def scan(buffer, start, end, final=True):
+    row = START
+    last_token, last_end = False, start
+    position = start
+    while position < end:
+        code = buffer[position]
+        column = COLUMNS[code] if code < 256 else wide_column(code)
+        if column == NO_COLUMN:
+            break
+        row = TABLE[row * WIDTH + column]
+        if row == DEAD:
+            break
+        position += 1
+        if ACCEPT[row] is not None:
+            last_token, last_end = ACCEPT[row], position
+    else:
+        if not final:
+            return None, end
+    if last_token is False:
+        return False, position
+    return last_token, last_end
+
+
+def tokens(buffer, final=True):
+    forward, end = 0, len(buffer)
+    while forward < end:
+        token, position = scan(buffer, forward, end, final)
+        if token is None:
+            return
+        if token is False:
+            yield False, forward, position
+            forward += 1
+        else:
+            yield token, forward, position
+            forward = position
+
+
+def analyze(read_file_path, verb=True):
+    global verbose
+    verbose = verb
+    symbolTable = []
+    with open(read_file_path, 'r', encoding='utf-8') as f:
+        fileContent = f.read()
+    vrint(f'✔ File read successfully from {read_file_path}')
+
+    if len(fileContent) == 0:
+        vrint('✖ File is empty!')
+        return
+
+    for match, forward, end in tokens(codify(fileContent)):
+        if match is False:
+            vrint(f'✖ No match found! [{forward}:{end}], skipping this token...')
+            continue
+        lexeme = fileContent[forward:end]
+        vrint(f'✔ Match found! [{forward}:{end}]', match, '->', lexeme)
+        symbolTable.append((match, lexeme))
+        try:
+            ACTIONS[match](lexeme, forward, symbolTable)
+        except Exception as e:
+            vrint('On running return, found error:', e)
+    vrint('Analysis finished!')
+    return symbolTable
+
+
+def stream(read_file_path, chunk_size=65536, table_size=1024):
+    # The actions get the last table_size symbols, a whole table would grow with the input
+    symbolTable = deque(maxlen=table_size)
+    pending, offset = '', 0
+    with open(read_file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            final = not chunk
+            pending += chunk
+            forward = 0
+            for match, start, end in tokens(codify(pending), final):
+                forward = start + 1 if match is False else end
+                if match is False:
+                    vrint(f'✖ No match found! [{offset + start}]')
+                    continue
+                lexeme = pending[start:end]
+                symbolTable.append((match, lexeme))
+                try:
+                    ACTIONS[match](lexeme, offset + start, symbolTable)
+                except Exception as e:
+                    vrint('On running return, found error:', e)
+                yield match, lexeme, offset + start
+            pending = pending[forward:]
+            offset += forward
+            if final:
+                break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexer Analyzer")
+    parser.add_argument('read_file_path', type=str,
+                        help='The .txt to tokenize')  # Read from file
+    parser.add_argument('verbose', type=str2bool,
+                        help='A boolean flag to show the logs or not.')  # Show logs
+    parser.add_argument('--stream', action='store_true',
+                        help='Print the tokens as they are read, in bounded memory.')  # Stream mode
+
+    args = parser.parse_args()
+
+    global verbose
+    verbose = args.verbose
+
+    if args.stream:
+        for token in stream(args.read_file_path):
+            print(token)
+    else:
+        print(analyze(args.read_file_path, verbose))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+@File name: benchmark.py
+@Module: Benchmarks
+@Description: Timings for the generated analyzers, run as python benchmark.py <benchmark> [--scale N].
+"""
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from yalex import yalex
+from src.utils.tools import readFile, readChunks
+from src._expression import Expression
+from src.grammar import Grammar
+from src.parse_table import ParseTable
+from src.lr_parser import LRParser
+from src._yapal_seq import YapalSequencer
+from tests.test_dir_dfa import transitions_scan, sliced_tokens
+
+
+def buildAnalyzer(yal_path: str):
+    '''
+    Runs yalex over the .yal file in a temporary directory and returns the final DIR DFA, skipping the build cache.
+    '''
+    with tempfile.TemporaryDirectory() as dir_name, contextlib.redirect_stdout(io.StringIO()):
+        return yalex(yal_path, dir_name, False, False, False, False)
+
+
+def scaledInputs(scale: int) -> list[tuple[str, str, str]]:
+    '''
+    Returns (yal path, txt path, content repeated scale times) for every input/tests/*/*.txt with a .yal beside it.
+    '''
+    inputs = []
+    for txt_path in sorted(glob.glob('input/tests/*/*.txt')):
+        yal_paths = sorted(
+            glob.glob(os.path.join(os.path.dirname(txt_path), '*.yal')))
+        if yal_paths:
+            inputs.append((yal_paths[0], txt_path, readFile(txt_path) * scale))
+    return inputs
+
+
+def timed(function: callable, *args):
+    '''
+    Returns the result of the call and the seconds it took.
+    '''
+    start_time = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start_time
+
+
+def benchTable(scale: int):
+    '''
+    Transitions list scan against the compiled table, over the scaled test inputs.
+    Both run in the driver loop of the analyzers before tokens(), which the scan was written for.
+    '''
+    for yal_path, txt_path, content in scaledInputs(scale):
+        dfa = buildAnalyzer(yal_path)
+        codified = Expression().extraSoftCodify(content)
+
+        _, scan_time = timed(sliced_tokens, lambda input: transitions_scan(dfa, input), codified)
+        tokens, table_time = timed(sliced_tokens, dfa.specialSimulate, codified)
+
+        print(f'{txt_path} x{scale}: {len(content)} chars, {len(tokens)} tokens, {dfa.width} columns')
+        print(f'\ttransitions scan: {len(content) / scan_time:,.0f} chars/s')
+        print(f'\ttable:            {len(content) / table_time:,.0f} chars/s ({scan_time / table_time:.1f}x)')
+
+
+def benchBatch(scale: int):
+    '''
+    Records per second lexing the lines of the scaled test inputs one by one against the NumPy batch scanner.
+    '''
+    for yal_path, txt_path, content in scaledInputs(scale):
+        dfa = buildAnalyzer(yal_path)
+        records = content.splitlines() * 10
+        codify = Expression().extraSoftCodify
+
+        _, scalar_time = timed(
+            lambda: [list(dfa.tokens(codify(record))) for record in records])
+        _, batch_time = timed(dfa.batchTokens, records)
+
+        print(f'{txt_path} x{scale}: {len(records)} records')
+        print(f'\tscalar: {len(records) / scalar_time:,.0f} records/s')
+        print(f'\tbatch:  {len(records) / batch_time:,.0f} records/s ({scalar_time / batch_time:.1f}x)')
+
+
+def syntheticExpression(terms: int) -> str:
+    '''
+    Returns an arithmetic expression of the slr-1 grammar with the given number of identifiers, nesting a group every few terms.
+    '''
+    pieces = []
+    for term in range(terms):
+        if term % 7 == 3:
+            pieces.append('(')
+        pieces.append(f'x{term}')
+        if term % 7 == 5:
+            pieces.append(')')
+        pieces.append(' * ' if term % 3 else ' + ')
+    text = ''.join(pieces[:-1])
+    return text + ')' * (text.count('(') - text.count(')')) + '\n'
+
+
+def benchParse(scale: int):
+    '''
+    Tokens per second of lexing a generated expression alone and of lexing and parsing it in a single pass over the stream.
+    '''
+    import src.YAPAL_TOKENIZER as tokenizer
+
+    dfa = buildAnalyzer('input/tests/slr-1/slr-1.yal')
+    sequencer = YapalSequencer(tokenizer.analyze('input/tests/slr-1/slr-1.yalp', False))
+    sequencer.sequence()
+    grammar = Grammar(sequencer.get_defined_productions())
+    grammar.augment()
+    table = ParseTable(grammar, sequencer.get_symbols())
+
+    for terms in [scale * 50, scale * 250, scale * 500]:
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt') as f:
+            f.write(syntheticExpression(terms))
+            f.flush()
+
+            tokens, lex_time = timed(lambda: sum(1 for _ in dfa.stream(readChunks(f.name))))
+            parser = LRParser(table, sequencer.get_ignored_tokens())
+            tree, parse_time = timed(parser.parse, dfa.stream(readChunks(f.name)))
+
+            assert tree is not None, f'Expression not accepted: {parser.errorsManager.errors[0].error}'
+            print(f'{terms} identifiers: {tokens} tokens')
+            print(f'\tlex:         {tokens / lex_time:,.0f} tokens/s')
+            print(f'\tlex + parse: {tokens / parse_time:,.0f} tokens/s')
+
+
+def benchImport(scale: int):
+    '''
+    Startup of the meta lexer patterns in a fresh interpreter: import alone and first use building every automaton.
+    '''
+    use = ('import src.utils.patterns as patterns\n'
+           'for pattern in vars(patterns).values():\n'
+           '    if isinstance(pattern, patterns.Pattern):\n'
+           '        pattern.min_dir_dfa\n')
+
+    env = {**os.environ, 'PYTHONPATH': os.getcwd()}
+
+    def run(code: str):
+        subprocess.run([sys.executable, '-c', code], env=env, check=True)
+
+    def best(code: str):
+        return min(timed(run, code)[1] for _ in range(max(1, scale // 40)))
+
+    interpreter_time = best('pass')
+    import_time = best('import src.utils.patterns')
+    use_time = best(use)
+
+    print(f'Interpreter startup: {interpreter_time:.3f}s')
+    print(f'\timport:    +{import_time - interpreter_time:.3f}s')
+    print(f'\tfirst use: +{use_time - interpreter_time:.3f}s')
+
+
+BENCHMARKS = {
+    'table': benchTable,
+    'batch': benchBatch,
+    'parse': benchParse,
+    'import': benchImport,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Analyzers Benchmarks")
+    parser.add_argument('benchmark', type=str, choices=BENCHMARKS.keys(),
+                        help='The benchmark to run')  # Benchmark name
+    parser.add_argument('--scale', type=int, default=200,
+                        help='How many times each input is repeated')  # Input scale
+
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args.scale)
@@ -0,0 +1,92 @@
+"""
+@File name: _actions.py
+@Module: Actions
+@Description: This file contains the RETURN code of the rules compiled into functions.
+"""
+
+from src.utils.tools import errorsManager
+import builtins
+import marshal
+import textwrap
+
+ACTION_PARAMETERS = 'lexeme, position, symbolTable'
+
+
+class Actions(object):
+    '''
+    This class compiles the RETURN code of every rule once, so matching a token is a dict lookup plus a call.
+    '''
+
+    def __init__(self, returnDict: dict = {}):
+        '''
+        This is the constructor of the class.
+        Parameters:
+        - returnDict: The RETURN code of every token, braces included.
+        '''
+        self.errorsManager = errorsManager()
+        self.sources: dict[str, str] = {}
+        self.codes: dict = {}
+        self.functions: dict[str, callable] = {}
+        for token, code in returnDict.items():
+            self.add(token, code)
+
+    def add(self, token: str, code: str):
+        '''
+        This function compiles the RETURN code of a token into a function of (lexeme, position, symbolTable).
+        '''
+        body = textwrap.dedent(
+            code[1:-1].encode().decode('unicode_escape')).strip()
+        self.compileBody(token, body)
+
+    def compileBody(self, token: str, body: str):
+        '''
+        This function compiles the unescaped body of a RETURN code.
+        A body that does not compile is replaced by one raising the error, as running it did before.
+        '''
+        try:
+            code = compile(self.definition(body), f'<{token} action>', 'exec')
+        except SyntaxError as e:
+            self.errorsManager.addError(
+                f'RETURN code of \"{token}\" does not compile: {e}', 'The action raises when the token is matched.')
+            body = f'raise SyntaxError({str(e)!r})'
+            code = compile(self.definition(body), f'<{token} action>', 'exec')
+        self.sources[token] = body
+        self.codes[token] = code
+        self.functions[token] = self.load(code)
+
+    def definition(self, body: str, name: str = 'action') -> str:
+        '''
+        This function returns the source of the function running the body.
+        '''
+        return f'def {name}({ACTION_PARAMETERS}):\n' + textwrap.indent(body or 'pass', '    ')
+
+    def load(self, code) -> callable:
+        '''
+        This function runs a compiled action definition and returns the function it defines.
+        '''
+        namespace = {'__builtins__': builtins}
+        exec(code, namespace)
+        return namespace['action']
+
+    def __getstate__(self) -> dict:
+        '''
+        Functions can not be pickled, the compiled code is stored with marshal instead.
+        '''
+        return {
+            'sources': self.sources,
+            'codes': {token: marshal.dumps(code) for token, code in self.codes.items()}
+        }
+
+    def __setstate__(self, state: dict):
+        self.errorsManager = errorsManager()
+        self.sources = state['sources']
+        self.codes = {}
+        self.functions = {}
+        for token, code in state['codes'].items():
+            try:
+                self.codes[token] = marshal.loads(code)
+            except (ValueError, EOFError, TypeError):
+                # Pickled by another Python version, compile again
+                self.compileBody(token, self.sources[token])
+                continue
+            self.functions[token] = self.load(self.codes[token])
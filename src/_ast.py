@@ -10,7 +10,6 @@
 from src.utils.constants import KLEENE_STAR, OR, CONCAT, ZERO_OR_ONE, ONE_OR_MORE, EPSILON
 from src.utils.structures.tree_node import TreeNode
 from src.utils.tools import errorsManager
-from graphviz import Digraph
 
 
 class AbstractSyntaxTree(object):
@@ -28,7 +27,7 @@ class AbstractSyntaxTree(object):
         self.alphabet: set[str] = set()
         self.root: TreeNode = self.PE2AS(
             postfixRegEx)
-        self.alphabet = sorted(list(self.alphabet))
+        self.alphabet = sorted(list(self.alphabet), key=str)
 
     '''
     ↓↓ ALGORITHMS ↓↓
@@ -72,9 +71,11 @@ class AbstractSyntaxTree(object):
                         'There is no character to apply the one or more to', 'Invalid regular expression'
                     )
                     return None
-                peaked = stack.pop()
-                stack.append(TreeNode(CONCAT, TreeNode(
-                    KLEENE_STAR, peaked), peaked.deepCopy()))
+                stack.append(TreeNode(c, stack.pop()))
+            elif isinstance(c, AbstractSyntaxTree):
+                # A fragment of a previous definition, each use gets its own copy
+                stack.append(c.root.deepCopy())
+                self.alphabet.update(c.alphabet)
             else:
                 stack.append(TreeNode(c))
                 if c != EPSILON:
@@ -89,6 +90,9 @@ class AbstractSyntaxTree(object):
         '''
         This method is made for drawing the abstract syntax tree.
         '''
+        # Imported here, graphviz is most of the import time of the package
+        from graphviz import Digraph
+
         dot = Digraph(
             graph_attr={
                 'rankdir': 'TB',
@@ -97,10 +101,12 @@ class AbstractSyntaxTree(object):
 
         dot.attr(label=label)
 
-        def add_nodes_edges(tree_node, parent_id=None):
-            # Base case: if the tree node is None, return
+        # Walk the tree with an explicit stack of (node, parent id), the left child is drawn first
+        stack = [(self.root, None)]
+        while stack:
+            tree_node, parent_id = stack.pop()
             if tree_node is None:
-                return
+                continue
 
             # Create a unique id for the current node
             node_id = id(tree_node)
@@ -116,17 +122,13 @@ class AbstractSyntaxTree(object):
             else:
                 label = tree_node.value
 
-            dot.node(str(node_id), label=label)
+            dot.node(str(node_id), label=str(label))
 
             # If this is not the root node, add an edge from the parent node to the current node
             if parent_id is not None:
                 dot.edge(str(parent_id), str(node_id))
 
-            # Recurse on the left and right children
-            add_nodes_edges(tree_node.left, node_id)
-            add_nodes_edges(tree_node.right, node_id)
-
-        # Start the recursion from the root
-        add_nodes_edges(self.root)
+            stack.append((tree_node.right, node_id))
+            stack.append((tree_node.left, node_id))
 
         dot.render(f'output/{id_}/{name}', format='png', cleanup=True)
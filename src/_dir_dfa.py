@@ -2,10 +2,15 @@ from .models._automaton import Automaton
 from .utils.structures.tree_node import TreeNode
 from .utils.structures.state import State
 from .utils.structures.transition import Transition
-from .utils.constants import EPSILON, OR, CONCAT, KLEENE_STAR, TERMINATOR
-from collections import defaultdict
+from .utils.constants import EPSILON, OR, CONCAT, KLEENE_STAR, ONE_OR_MORE, TERMINATOR, HASHTAG
+from .utils.structures.char_class import CharClass
+from collections import defaultdict, deque
+from itertools import chain
+from array import array
+import pickle as pkl
 
-from .utils.tools import numberToLetter
+from .utils.tools import numberToLetter, iterateBits
+from ._expression import Expression
 import time
 
 
@@ -24,15 +29,38 @@ class DirectDeterministicFiniteAutomaton(Automaton):
 
         self.abstractSyntaxTree: TreeNode = abstractSyntaxTree
         self.symbols: dict = dict()
+        self.positionsOf: dict = dict()
+        self.alphabet: list = []
         self.followPosDict: dict = dict()
         self.counter: int = 0
 
         self.returnDict = {}
+        self.actions = None
 
         self.preprocess()
         self.process()
         self.build()
         self.postprocessing()
+        self.compile()
+
+    def __getstate__(self) -> dict:
+        '''
+        The build-only state is left out of the pickle, only the states, the compiled table and the actions are needed once built.
+        The tree makes pickle recurse through it, and the followPos and positions bitmasks grow with the square of the positions.
+        '''
+        state = self.__dict__.copy()
+        for name in ('abstractSyntaxTree', 'symbols', 'positionsOf', 'alphabet', 'followPosDict'):
+            state[name] = None
+        return state
+
+    def __setstate__(self, state: dict):
+        '''
+        Analyzers pickled before the compiled actions only have the RETURN code in returnDict, the drivers can not run them.
+        '''
+        if 'actions' not in state:
+            raise pkl.UnpicklingError(
+                'Analyzer pickled by an older yalex, regenerate it running yalex.py over its .yal')
+        super().__setstate__(state)
 
     def preprocess(self):
         '''
@@ -43,23 +71,34 @@ class DirectDeterministicFiniteAutomaton(Automaton):
         newRoot = TreeNode(CONCAT, TreeNode(TERMINATOR),
                            self.abstractSyntaxTree)
         self.abstractSyntaxTree = newRoot
-        self.abstractSyntaxTree.postOrderTraversal(self.toCustomNode)
+        leaves = []
+        self.abstractSyntaxTree.postOrderTraversal(
+            lambda node: self.toCustomNode(node, leaves))
+
+        # The TERMINATOR and the '#TOKEN' markers follow the last positions of whole rules,
+        # numbering them first keeps those followPos bitmasks a few bits long
+        leaves.sort(key=lambda leaf: not isinstance(leaf.value, str))
+        for leaf in leaves:
+            self.counter += 1
+            leaf.id = self.counter
+            self.symbols[leaf.id] = leaf.value
+        self.splitAlphabet()
 
     def process(self):
         '''
         This method is made for process the automaton.
 
-        Specific: Get the nullable, firstPos, lastPos and followPos of the nodes of the Abstract Syntax Tree.
+        Specific: Get the nullable, firstPos, lastPos and followPos of the nodes of the Abstract Syntax Tree, in a single traversal.
+        The position sets are int bitmasks, the bit i is the position i.
         '''
-        self.abstractSyntaxTree.postOrderTraversal(self.nullable)
-        self.abstractSyntaxTree.postOrderTraversal(self.firstAndLastPos)
-        self.abstractSyntaxTree.postOrderTraversal(self.followPos)
+        self.abstractSyntaxTree.postOrderTraversal(self.positions)
 
     def build(self):
         '''
         This method is made for build the automaton.
 
-        Specific: Build the direct deterministic finite automaton.
+        Specific: Build the direct deterministic finite automaton, with one edge per class of the alphabet.
+        The unmarked states wait in a queue and every state is found in a dict by its positions bitmask.
         @Reference: Figure 3.62: Construction of a DFA directly from a regular expression. Aho - Compilers: Principles, Techniques, and Tools (2nd Edition)
         '''
         initialState = State(
@@ -68,25 +107,28 @@ class DirectDeterministicFiniteAutomaton(Automaton):
         self.states.append(initialState)
         self.counter = 1
 
-        while any(not state.marked for state in self.states):
-            S = next(state for state in self.states if not state.marked)
+        stateOf = {initialState.value: initialState}
+        unmarked = deque([initialState])
+        while unmarked:
+            S = unmarked.popleft()
             S.marked = True
 
-            symbols = defaultdict(list)
-            for id in S.value:
-                symbol = self.symbols[id]
-                symbols[symbol].append(id)
-
-            for symbol in symbols:
+            for symbol, positions in self.positionsOf.items():
+                ids = S.value & positions
+                if not ids:
+                    continue
                 if symbol != TERMINATOR:
-                    U = set()
-                    for id in symbols[symbol]:
-                        U = U.union(self.followPosDict.get(id, set()))
-                    if not any(state.value == U for state in self.states):
-                        self.states.append(State(U, self.counter))
+                    U = 0
+                    for id in iterateBits(ids):
+                        U |= self.followPosDict.get(id, 0)
+                    T = stateOf.get(U)
+                    if T is None:
+                        T = State(U, self.counter)
                         self.counter += 1
-                    U = next(state for state in self.states if state.value == U)
-                    self.transitions.append(Transition(S.id, U.id, symbol))
+                        self.states.append(T)
+                        stateOf[U] = T
+                        unmarked.append(T)
+                    self.transitions.append(Transition(S.id, T.id, symbol))
                 else:
                     S.acceptance = True
                     self.acceptanceStates.append(S)
@@ -98,6 +140,73 @@ class DirectDeterministicFiniteAutomaton(Automaton):
         for state in self.states:
             state.value = state.id
 
+    def minimize(self):
+        '''
+        This method is made for minimize the automaton of an analyzer, keeping the token each state accepts.
+
+        Specific: The initial partition splits the states by the token of their '#TOKEN' edges, the first in returnDict when there are several,
+        then Hopcroft's algorithm refines it over the other symbols. The states reached by '#TOKEN' edges are merged into a single final state.
+        '''
+        priority = {token: idx for idx, token in enumerate(self.returnDict)}
+
+        def rank(token): return priority.get(token, len(priority))
+
+        final = {state.id for state in self.acceptanceStates}
+        states = [state for state in self.states if state.id not in final]
+        indexOf = {state.id: i for i, state in enumerate(states)}
+        dead = len(states)
+
+        accepts = [None] * dead
+        symbols = {}
+        for transition in self.transitions:
+            if self.isMarker(transition.using):
+                i = indexOf[transition.tail_id]
+                token = transition.using[1:]
+                if accepts[i] is None or rank(token) < rank(accepts[i]):
+                    accepts[i] = token
+            elif transition.using not in symbols:
+                symbols[transition.using] = len(symbols)
+
+        delta = [array('i', [dead]) * (dead + 1) for _ in symbols]
+        for transition in self.transitions:
+            if not self.isMarker(transition.using):
+                delta[symbols[transition.using]][indexOf[transition.tail_id]
+                                                 ] = indexOf[transition.head_id]
+
+        groups = defaultdict(list)
+        for i in range(dead):
+            groups[accepts[i]].append(i)
+        groups[None].append(dead)
+        blockOf = self.refinePartition(delta, list(groups.values()))
+
+        # The first state of each block represents it, the blocks merged with the dead state are dropped
+        initial = indexOf[self.initialState.id]
+        representatives = {}
+        for i in range(dead):
+            if blockOf[i] != blockOf[dead] or blockOf[i] == blockOf[initial]:
+                representatives.setdefault(blockOf[i], i)
+        newId = {block: k for k, block in enumerate(representatives)}
+
+        self.states = [State(k, k) for k in range(len(representatives))]
+        finalState = State(len(self.states), len(self.states), acceptance=True)
+        self.transitions = []
+        for block, i in representatives.items():
+            for a, k in symbols.items():
+                j = blockOf[delta[k][i]]
+                if j in newId:
+                    self.transitions.append(Transition(newId[block], newId[j], a))
+            if accepts[i] is not None:
+                self.transitions.append(Transition(
+                    newId[block], finalState.id, f'{HASHTAG}{accepts[i]}'))
+
+        self.initialState = self.states[newId[blockOf[initial]]]
+        self.initialState.initial = True
+        self.acceptanceStates = []
+        if any(accept is not None for accept in accepts):
+            self.states.append(finalState)
+            self.acceptanceStates.append(finalState)
+        self.compile()
+
     '''
     ↓↓ INNER CLASSES ↓↓
     '''
@@ -106,19 +215,19 @@ class DirectDeterministicFiniteAutomaton(Automaton):
         This class represents a custom node for the direct deterministic finite automaton.
         '''
 
-        def __init__(self, value: str, id: int, firstPos: set = set(), lastPos: set = set(), nullable: bool = None) -> None:
+        def __init__(self, value: str, id: int, firstPos: int = 0, lastPos: int = 0, nullable: bool = None) -> None:
             '''
             This is the constructor of the class.
             Parameters:
             - value: The value of the node.
-            - firstPos: The first position set of the node.
-            - lastPos: The last position set of the node.
+            - firstPos: The first position set of the node, as a bitmask.
+            - lastPos: The last position set of the node, as a bitmask.
             - nullable: The nullable property of the node.
             '''
             self.value: str = value
             self.id: int = id
-            self.firstPos: set = firstPos
-            self.lastPos: set = lastPos
+            self.firstPos: int = firstPos
+            self.lastPos: int = lastPos
             self.nullable: bool = nullable
     '''
     ↑↑ END INNER CLASSES ↑↑
@@ -128,17 +237,47 @@ class DirectDeterministicFiniteAutomaton(Automaton):
     ↓↓ ASSOCIATED FUNCTIONS ↓↓
     '''
 
-    def toCustomNode(self,  node: TreeNode):
+    def splitAlphabet(self):
         '''
-        This function is made for transform a TreeNode to a CustomNode.
+        This function splits the codes of the leaves into classes, two codes share a class when every leaf matches both or none.
+
+        Specific: A sweep over the range bounds toggles the bit of each leaf position, the codes between two bounds share the same positions.
+        positionsOf maps each class, and each non character symbol, to the bitmask of the positions that match it.
         '''
+        bounds = defaultdict(int)
+        for id, symbol in self.symbols.items():
+            if isinstance(symbol, int):
+                bounds[symbol] ^= 1 << id
+                bounds[symbol + 1] ^= 1 << id
+            elif isinstance(symbol, CharClass):
+                for lo, hi in symbol:
+                    bounds[lo] ^= 1 << id
+                    bounds[hi + 1] ^= 1 << id
+            else:
+                self.positionsOf[symbol] = self.positionsOf.get(
+                    symbol, 0) | 1 << id
 
-        if node.value not in [EPSILON, OR, CONCAT, KLEENE_STAR]:
-            self.counter += 1
-            self.symbols[self.counter] = node.value
-            node.value = self.CustomNode(node.value, self.counter)
-        else:
-            node.value = self.CustomNode(node.value, None)
+        rangesOf = defaultdict(list)
+        active = 0
+        points = sorted(bounds)
+        for lo, next in zip(points, points[1:]):
+            active ^= bounds[lo]
+            if active:
+                rangesOf[active].append((lo, next - 1))
+
+        classes = {CharClass(ranges): positions for positions,
+                   ranges in rangesOf.items()}
+        self.positionsOf = {**classes, **self.positionsOf}
+        self.alphabet = [
+            symbol for symbol in self.positionsOf if symbol != TERMINATOR]
+
+    def toCustomNode(self,  node: TreeNode, leaves: list):
+        '''
+        This function is made for transform a TreeNode to a CustomNode, the leaves are collected to be numbered later.
+        '''
+        node.value = self.CustomNode(node.value, None)
+        if node.value.value not in [EPSILON, OR, CONCAT, KLEENE_STAR, ONE_OR_MORE]:
+            leaves.append(node.value)
     '''
     ↑↑ END ASSOCIATED FUNCTIONS ↑↑
     '''
@@ -147,95 +286,232 @@ class DirectDeterministicFiniteAutomaton(Automaton):
     ↓↓ ALGORITHMS ↓↓
     '''
 
-    def nullable(self, node: TreeNode):
+    def positions(self, node: TreeNode):
         '''
-        This function modifies the nullable attribute of the node.
+        This function modifies the nullable, firstPos and lastPos attributes of the node, and adds its edges to followPos.
+        The children are already computed, because the traversal is post order.
         '''
-        if node.value.value == EPSILON:
-            node.value.nullable = True
-        elif node.value.value == OR:
-            node.value.nullable = node.left.value.nullable or node.right.value.nullable
-        elif node.value.value == CONCAT:
-            node.value.nullable = node.left.value.nullable and node.right.value.nullable
-        elif node.value.value == KLEENE_STAR:
-            node.value.nullable = True
-        else:
-            node.value.nullable = False
-
-    def firstAndLastPos(self, node: TreeNode) -> set:
-        '''
-        This function modifies the firstPos and lastPos attributes of the node.
-        '''
-        if node.value.value == EPSILON:
-            node.value.firstPos = set()
-            node.value.lastPos = set()
-        elif node.value.value == OR:
-            node.value.firstPos = node.left.value.firstPos.union(
-                node.right.value.firstPos)
-            node.value.lastPos = node.left.value.lastPos.union(
-                node.right.value.lastPos)
-        elif node.value.value == CONCAT:
-            if node.left.value.nullable:
-                node.value.firstPos = node.left.value.firstPos.union(
-                    node.right.value.firstPos)
-            else:
-                node.value.firstPos = node.left.value.firstPos
-            if node.right.value.nullable:
-                node.value.lastPos = node.left.value.lastPos.union(
-                    node.right.value.lastPos)
+        custom = node.value
+        value = custom.value
+        followPosDict = self.followPosDict
+
+        if value == EPSILON:
+            custom.nullable = True
+            custom.firstPos = 0
+            custom.lastPos = 0
+        elif value == OR:
+            left, right = node.left.value, node.right.value
+            custom.nullable = left.nullable or right.nullable
+            custom.firstPos = left.firstPos | right.firstPos
+            custom.lastPos = left.lastPos | right.lastPos
+        elif value == CONCAT:
+            left, right = node.left.value, node.right.value
+            custom.nullable = left.nullable and right.nullable
+            if left.nullable:
+                custom.firstPos = left.firstPos | right.firstPos
             else:
-                node.value.lastPos = node.right.value.lastPos
-        elif node.value.value == KLEENE_STAR:
-            if node.right:
-                node.value.firstPos = node.right.value.firstPos
-                node.value.lastPos = node.right.value.lastPos
+                custom.firstPos = left.firstPos
+            if right.nullable:
+                custom.lastPos = left.lastPos | right.lastPos
             else:
-                node.value.firstPos = node.left.value.firstPos
-                node.value.lastPos = node.left.value.lastPos
+                custom.lastPos = right.lastPos
+            # If n is a cat-node with left child  c1 and right child c2, then every position i in lastpost(c1), all positions in firstpos(c2) are in followpos(i).
+            for i in iterateBits(left.lastPos):
+                followPosDict[i] = followPosDict.get(i, 0) | right.firstPos
+        elif value in [KLEENE_STAR, ONE_OR_MORE]:
+            child = node.right.value if node.right else node.left.value
+            custom.nullable = value == KLEENE_STAR or child.nullable
+            custom.firstPos = child.firstPos
+            custom.lastPos = child.lastPos
+            # if n is a star-node or a plus-node, and i is a position in lastpos(n), then all positions in firstpos(n) ar in followpos(i).
+            for i in iterateBits(custom.lastPos):
+                followPosDict[i] = followPosDict.get(i, 0) | custom.firstPos
         else:
-            node.value.firstPos = {node.value.id}
-            node.value.lastPos = {node.value.id}
-
-    def followPos(self, node: TreeNode):
-        '''
-        This function modifies the followPos attribute of the node.
-        '''
+            custom.nullable = False
+            custom.firstPos = 1 << custom.id
+            custom.lastPos = 1 << custom.id
 
-        # If n is a cat-node with left child  c1 and right child c2, then every position i in lastpost(c1), all positions in firstpos(c2) are in followpos(i).
-        if node.value.value == CONCAT:
-            for i in node.left.value.lastPos:
-                self.followPosDict[i] = self.followPosDict.get(i, set()).union(
-                    node.right.value.firstPos)
-        # if n is a star-node, and i is a position in lastpos(n), then all positions in firstpos(n) ar in followpos(i).
-        elif node.value.value == KLEENE_STAR:
-            for i in node.value.lastPos:
-                self.followPosDict[i] = self.followPosDict.get(i, set()).union(
-                    node.value.firstPos)
     '''
     ↑↑ END ALGORITHMS ↑↑
     '''
 
+    def scan(self, buffer, start: int = 0, end: int = None, final: bool = True):
+        '''
+        This method finds the longest token starting at start, walking the buffer in place instead of a copy of it.
+        Parameters:
+        - buffer: The codified input.
+        - start: The position where the lexeme begins.
+        - end: The position where the input ends, the whole buffer by default.
+        - final: False when more input may follow end, so a lexeme still growing there can not be decided yet.
+        Returns:
+        - (token, end of the lexeme) for the last accepting state reached, else (False, position where it got stuck).
+        - (None, end) when final is False and the automaton was still running at end.
+        '''
+        if end is None:
+            end = len(buffer)
+        table, width = self.table, self.width
+        byteColumns, columnOfCode = self.byteColumns, self.columnOfCode
+        acceptTokens = self.acceptTokens
+        row = self.startRow
+        lastToken, lastEnd = False, start
+        position = start
+        while position < end:
+            c = buffer[position]
+            column = byteColumns[c] if c < 256 else columnOfCode(c)
+            if column < 0:
+                break
+            row = table[row * width + column]
+            if row < 0:
+                break
+            position += 1
+            if acceptTokens[row] is not None:
+                lastToken, lastEnd = acceptTokens[row], position
+        else:
+            if not final:
+                return None, end
+        if lastToken is False:
+            return False, position
+        return lastToken, lastEnd
+
+    def tokens(self, buffer, start: int = 0, end: int = None, final: bool = True):
+        '''
+        This method yields (token, start, end) for every lexeme in the buffer, using the longest match.
+        A character no token matches is yielded as (False, start, position where it got stuck) and skipped.
+        When final is False it stops before a lexeme that could continue past end.
+        '''
+        if end is None:
+            end = len(buffer)
+        forward = start
+        while forward < end:
+            token, position = self.scan(buffer, forward, end, final)
+            if token is None:
+                return
+            if token is False:
+                yield False, forward, position
+                forward += 1
+            else:
+                yield token, forward, position
+                forward = position
+
+    def stream(self, chunks):
+        '''
+        This method yields (token, lexeme, offset) for text that arrives in chunks, such as readChunks over a file.
+        Only the chunk being scanned and the lexeme carried over from the previous one are kept in memory.
+        A character no token matches is yielded as (False, character, offset).
+        '''
+        codify = Expression().extraSoftCodify
+        pending = ''
+        offset = 0
+        for chunk, final in chain(((chunk, False) for chunk in chunks), [('', True)]):
+            pending += chunk
+            forward = 0
+            for token, start, end in self.tokens(codify(pending), final=final):
+                if token is False:
+                    yield False, pending[start], offset + start
+                    forward = start + 1
+                else:
+                    yield token, pending[start:end], offset + start
+                    forward = end
+            pending = pending[forward:]
+            offset += forward
+
+    def batchTokens(self, records, offsets: list[int] = None) -> list[list[tuple]]:
+        '''
+        This method tokenizes many small inputs together, the same as tokens() over each one of them.
+
+        Specific: All the records advance one character per step through a NumPy transition matrix,
+        states[:] = table[states, columns[positions]], and the ones that got stuck emit their token and start the next one.
+        Without NumPy every record goes through tokens().
+        Parameters:
+        - records: A list of strings, or a packed byte buffer with the offsets of its records.
+        - offsets: The start of every record in the buffer followed by the end of the last one.
+        Returns:
+        - The (token, start, end) of every record, with start and end inside the record. False is the token of a character no token matches.
+        '''
+        if offsets is None:
+            offsets = [0]
+            for record in records:
+                offsets.append(offsets[-1] + len(record))
+            records = Expression().extraSoftCodify(''.join(records))
+
+        try:
+            # NumPy is only needed for batches, the analyzers run without it
+            import numpy as np
+        except ImportError:
+            return [[(token, start - offsets[k], end - offsets[k]) for token, start, end in self.tokens(records, offsets[k], offsets[k + 1])]
+                    for k in range(len(offsets) - 1)]
+
+        begins = np.asarray(offsets[:-1], np.int64)
+        ends = np.asarray(offsets[1:], np.int64)
+        # Any buffer of codes: bytes, bytearray, an array of code points or a memoryview of them
+        codes = np.frombuffer(records, np.dtype(memoryview(records).format))
+        codes = np.append(codes, 0).astype(np.int64)
+
+        # The column of every character, -1 when no transition uses it
+        columns = np.asarray(self.byteColumns, np.int64)[np.minimum(codes, 255)]
+        wide = codes > 255
+        if wide.any():
+            wideCodes, inverse = np.unique(codes[wide], return_inverse=True)
+            columns[wide] = np.array([self.columnOfCode(int(code)) for code in wideCodes], np.int64)[inverse]
+
+        # An extra dead row and column, so the rows and columns -1 index them
+        table = np.full((len(self.states) + 1, self.width + 1), -1, np.int64)
+        table[:-1, :-1] = np.asarray(self.table, np.int64).reshape(len(self.states), self.width)
+        tokenNames = sorted({token for token in self.acceptTokens if token is not None})
+        tokenIds = np.array([-1 if token is None else tokenNames.index(token)
+                             for token in self.acceptTokens] + [-1], np.int64)
+
+        rows = np.full(len(begins), self.startRow, np.int64)
+        positions = begins.copy()
+        lastTokens = np.full(len(begins), -1, np.int64)
+        lastEnds = begins.copy()
+        starts = begins.copy()
+
+        found = []
+        active = np.flatnonzero(starts < ends)
+        while active.size:
+            position = positions[active]
+            inside = position < ends[active]
+            following = table[rows[active], np.where(inside, columns[position], -1)]
+
+            moved = following >= 0
+            going = active[moved]
+            rows[going] = following[moved]
+            positions[going] += 1
+            accepted = tokenIds[following[moved]]
+            accepting = accepted >= 0
+            lastTokens[going[accepting]] = accepted[accepting]
+            lastEnds[going[accepting]] = positions[going[accepting]]
+
+            stuck = active[~moved]
+            if stuck.size:
+                matched = lastTokens[stuck] >= 0
+                # A character no token matches is skipped, like tokens() does
+                tokenEnds = np.where(matched, lastEnds[stuck], positions[stuck])
+                found.append((stuck, lastTokens[stuck], starts[stuck], tokenEnds))
+                starts[stuck] = np.where(matched, lastEnds[stuck], starts[stuck] + 1)
+                positions[stuck] = starts[stuck]
+                lastEnds[stuck] = starts[stuck]
+                lastTokens[stuck] = -1
+                rows[stuck] = self.startRow
+                active = active[starts[active] < ends[active]]
+
+        if not found:
+            return [[] for _ in begins]
+        record, token, start, end = (np.concatenate(parts) for parts in zip(*found))
+        order = np.lexsort((start, record))
+        names = tokenNames + [False]
+        spans = list(zip([names[t] for t in token[order].tolist()],
+                         (start - begins[record])[order].tolist(),
+                         (end - begins[record])[order].tolist()))
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(record, minlength=len(begins))))).tolist()
+        return [spans[a:b] for a, b in zip(bounds, bounds[1:])]
+
     def specialSimulate(self, input: list):
         '''
         This method simulates for recognize tokens in the input.
         '''
         start_time = time.perf_counter()
-        statePointer = self.initialState.id
-        for idx, c in enumerate(input):
-            found = False
-            for transition in self.transitions:
-                if transition.tail_id == statePointer and transition.using == c:
-                    statePointer = transition.head_id
-                    found = True
-                    break
-            if not found:
-                for transition in self.transitions:
-                    if transition.tail_id == statePointer and transition.using.startswith('#'):
-                        # Return the transition using the '#' symbol
-                        return transition.using[1:], idx
-                return False, idx
-        if transition.tail_id == statePointer and transition.using.startswith('#'):
-            # Return the transition using the '#' symbol
-            return transition.using[1:], idx
+        result = self.scan(input)
         self.simulationTime = time.perf_counter() - start_time
-        return False, len(input)
+        return result
@@ -6,8 +6,13 @@
 @Description: This file contains main algorithms for the regular expression module.
 """
 
-from src.utils.constants import RPAREN, LPAREN, OR, ZERO_OR_ONE, ONE_OR_MORE, KLEENE_STAR, CONCAT, OPERATORS_PRECEDENCE, TRIVIAL_CHARACTER_PRECEDENCE, LBRACKET, RBRACKET, SINGLE_QUOTE, DOUBLE_QUOTE, RANGE, WS, ANY_NOT_IN, UNIVERSE, HASHTAG
+from src.utils.constants import RPAREN, LPAREN, OR, ZERO_OR_ONE, ONE_OR_MORE, KLEENE_STAR, CONCAT, OPERATORS_PRECEDENCE, TRIVIAL_CHARACTER_PRECEDENCE, LBRACKET, RBRACKET, SINGLE_QUOTE, DOUBLE_QUOTE, RANGE, WS, ANY_NOT_IN, UNIVERSE, HASHTAG, UNQUOTED_WS
+from src.utils.structures.char_class import CharClass
 from src.utils.tools import errorsManager
+from array import array
+import sys
+
+UTF_ENDIAN = 'le' if sys.byteorder == 'little' else 'be'
 
 
 class Expression(object):
@@ -32,6 +37,27 @@ class Expression(object):
         self.infixRegEx = self.transformGroupsOfCharacters(self.infixRegEx)
         self.infixRegEx = self.addExplicitConcatenation(self.infixRegEx)
         self.infixRegEx = self.shuntingYard(self.infixRegEx)
+
+    def hardProcessPieces(self, pieces: list):
+        '''
+        This function processes a regular expression given in pieces, each one is either text or an already built AbstractSyntaxTree.
+        A tree is kept as a single operand, so a definition is parsed once however many others use it.
+        '''
+        infixRegEx = []
+        text = ''
+        for piece in pieces:
+            if isinstance(piece, str):
+                text += piece
+            else:
+                # The text between two trees is codified at once, quotes may span several pieces
+                infixRegEx.extend(self.hardCodify(text))
+                infixRegEx.append(piece)
+                text = ''
+        infixRegEx.extend(self.hardCodify(text))
+        infixRegEx = self.transformGroupsOfCharacters(infixRegEx)
+        infixRegEx = self.addExplicitConcatenation(infixRegEx)
+        self.infixRegEx = self.shuntingYard(infixRegEx)
+
     '''
     ↓↓ ALGORITHMS ↓↓
     '''
@@ -104,11 +130,11 @@ class Expression(object):
 
     def hardCodify(self, infixRegEx: str) -> list:
         '''
-        This function takes a regular expression in infix notation and returns the regular expression codified using ascii codes.
+        This function takes a regular expression in infix notation and returns the regular expression codified using character codes.
         Parameters:
         - infixRegEx: A regular expression in infix notation.
         Returns:
-        - A regular expression codified using ascii codes.
+        - A regular expression codified using character codes, operators are kept as strings and '_' is a single CharClass.
         '''
         result = []
         skip_next = False
@@ -123,9 +149,9 @@ class Expression(object):
                         't': '\t',
                         's': ' '
                     }
-                    result.append(str(ord(translate[c])))
+                    result.append(ord(translate[c]))
                 else:
-                    result.append(str(ord(c)))
+                    result.append(ord(c))
                 skip_next = False
                 if inside_single_quote:
                     inside_single_quote_len += 1
@@ -134,7 +160,7 @@ class Expression(object):
             elif c == DOUBLE_QUOTE:
                 inside_double_quote = not inside_double_quote
             elif inside_double_quote:
-                result.append(str(ord(c)))
+                result.append(ord(c))
             elif c == SINGLE_QUOTE:
                 if inside_single_quote and inside_single_quote_len > 1:
                     raise ValueError(
@@ -142,15 +168,14 @@ class Expression(object):
                 inside_single_quote = not inside_single_quote
                 inside_single_quote_len = 0
             elif inside_single_quote:
-                result.append(str(ord(c)))
+                result.append(ord(c))
                 inside_single_quote_len += 1
             elif c == '_':
-                for i in range(256):
-                    result.append(str(i))
-                    if i != 255:
-                        result.append(OR)
+                result.append(UNIVERSE)
+            elif c == WS:
+                result.append(UNQUOTED_WS)
             elif c not in [LPAREN, RPAREN, OR, ZERO_OR_ONE, ONE_OR_MORE, KLEENE_STAR, CONCAT, LBRACKET, RBRACKET, DOUBLE_QUOTE, RANGE, WS, ANY_NOT_IN, HASHTAG]:
-                result.append(str(ord(c)))
+                result.append(ord(c))
             else:
                 result.append(c)
         return result
@@ -165,18 +190,30 @@ class Expression(object):
                 # If is inside a quote add as ASCII code, else appends as is
                 # Check have previous quote
                 # If is not the first character
-                if result[-1] in [str(ord(SINGLE_QUOTE))] and infixRegEx[idx+1] in [SINGLE_QUOTE]:
-                    result.append(str(ord(c)))
+                if result[-1] in [ord(SINGLE_QUOTE)] and infixRegEx[idx+1] in [SINGLE_QUOTE]:
+                    result.append(ord(c))
                 else:
-                    result.append(c)
+                    result.append(UNQUOTED_WS)
             else:
-                result.append(str(ord(c)))
+                result.append(ord(c))
         return result
 
-    def extraSoftCodify(self, infixRegEx: list) -> str:
-        result = []
-        for idx, c in enumerate(infixRegEx):
-            result.append(str(ord(c)))
+    def extraSoftCodify(self, infixRegEx: str) -> bytes | array:
+        '''
+        Characters to their codes, packed for the analyzers runtime.
+        Returns:
+        - The bytes of the text when every code fits in one byte, else an array of code points.
+        '''
+        try:
+            return infixRegEx.encode('latin-1')
+        except UnicodeEncodeError:
+            pass
+        if max(infixRegEx) <= '\uffff':
+            result = array('H')
+            result.frombytes(infixRegEx.encode(f'utf-16-{UTF_ENDIAN}'))
+        else:
+            result = array('I')
+            result.frombytes(infixRegEx.encode(f'utf-32-{UTF_ENDIAN}'))
         return result
 
     def transformGroupsOfCharacters(self, infixRegEx: list) -> list:
@@ -185,17 +222,16 @@ class Expression(object):
         Parameters:
         - infixRegEx: A regular expression in infix notation.
         Returns:
-        - A list of characters.
+        - The regular expression with every group as a single CharClass leaf.
         '''
         result = []
         idx = 0
-        first_group = []
+        first_group = None
 
         while idx < len(infixRegEx):
             c = infixRegEx[idx]
             if c == LBRACKET:
                 idx += 1
-                group_result = []
                 collected = []
                 has_any_not_in = False
                 extend_this = True
@@ -208,25 +244,22 @@ class Expression(object):
                     collected.append(infixRegEx[idx])
                     idx += 1
 
+                ranges = []
                 for local_idx in range(len(collected)):
                     if collected[local_idx] == RANGE:
-
-                        previous = collected[local_idx - 1]
-                        next = collected[local_idx + 1]
-                        for i in range(int(previous), int(next) + 1):
-                            group_result.append(str(i))
-                    else:
-                        group_result.append(collected[local_idx])
-
-                group_result = list(set(group_result))
+                        ranges.append(
+                            (collected[local_idx - 1], collected[local_idx + 1]))
+                    elif isinstance(collected[local_idx], int):
+                        ranges.append(
+                            (collected[local_idx], collected[local_idx]))
+                group_result = CharClass(ranges)
 
                 if has_any_not_in:
-                    group_result = list(set(UNIVERSE) - set(group_result))
+                    group_result = UNIVERSE.difference(group_result)
 
-                if first_group != []:
-                    group_result = list(
-                        set(first_group) - set(group_result))
-                    first_group = []
+                if first_group is not None:
+                    group_result = first_group.difference(group_result)
+                    first_group = None
 
                 idx += 1  # Skip the RBRACKET
                 if idx < len(infixRegEx) and infixRegEx[idx] == HASHTAG:
@@ -235,16 +268,7 @@ class Expression(object):
                     idx += 1
 
                 if extend_this:
-                    group_result.insert(0, LPAREN)
-                    for i in range(2, len(group_result)*2, 2):
-                        group_result.insert(i, OR)
-
-                    group_result.pop()
-                    group_result.append(RPAREN)
-
-                    result.extend(
-                        group_result
-                    )
+                    result.append(group_result)
             else:
                 result.append(c)
                 idx += 1
@@ -1,6 +1,7 @@
 from .models._automaton import Automaton
 from .utils.structures.transition import Transition
 from .utils.structures.state import State
+from array import array
 import time
 
 
@@ -17,137 +18,149 @@ class MinimizedDeterministicFiniteAutomaton(Automaton):
         self.counter: int = 0
 
         self.build()
+        self.compile()
 
         self.nested = False
         self.leftMatch = None
         self.rightMatch = None
+        self.leftRows: array = array('i')
+        self.rightRows: array = array('i')
+
+    def __getstate__(self) -> dict:
+        '''
+        The automaton it was minimized from is left out of the pickle, it is only needed to build.
+        '''
+        state = self.__dict__.copy()
+        state['dfa'] = None
+        return state
 
     def build(self):
         '''
         This method is made for build the automaton.
 
-        Specific: Minimize the deterministic finite automaton.
+        Specific: Minimize the deterministic finite automaton, refining the partition {F, S - F} with Hopcroft's algorithm.
+        The missing transitions go to an implicit dead state, the states merged with it are dropped.
         @Reference: Algorithm 3.39 : Minimizing the number of states of a DFA. Aho - Compilers: Principles, Techniques, and Tools (2nd Edition)
         '''
-        F = [state.id for state in self.dfa.acceptanceStates]
-        S_F = [state.id for state in self.dfa.states if state.id not in F]
-        II = [F, S_F]
-
-        IInew = self.partition(II)
-
-        while IInew != II:
-            II = IInew
-            IInew = self.partition(II)
-
-        IIfinal = II
-        representatives = [group[0] for group in IIfinal]
-
-        start_state = None
-        for i, group in enumerate(IIfinal):
-            if self.dfa.initialState.id in group:
-                start_state = representatives[i]
-                break
-
-        acceptance_states = []
-        for i, group in enumerate(IIfinal):
-            if any(state.id in group for state in self.dfa.acceptanceStates):
-                acceptance_states.append(representatives[i])
+        states = self.dfa.states
+        indexOf = {state.id: i for i, state in enumerate(states)}
+        dead = len(states)
+
+        symbols = list(self.alphabet)
+        symbolIndex = {a: k for k, a in enumerate(symbols)}
+        delta = [array('i', [dead]) * (dead + 1) for _ in symbols]
+        for transition in self.dfa.transitions:
+            k = symbolIndex.get(transition.using)
+            if k is not None:
+                delta[k][indexOf[transition.tail_id]
+                         ] = indexOf[transition.head_id]
+
+        accepting = {indexOf[state.id] for state in self.dfa.acceptanceStates}
+        II = [[i for i in range(dead + 1) if i in accepting],
+              [i for i in range(dead + 1) if i not in accepting]]
+        blockOf = self.refinePartition(delta, II)
+
+        # The first state of each block represents it
+        initial = indexOf[self.dfa.initialState.id]
+        representatives = {}
+        for i in range(dead):
+            if blockOf[i] != blockOf[dead] or blockOf[i] == blockOf[initial]:
+                representatives.setdefault(blockOf[i], i)
 
         transitions = []
-        for i, group in enumerate(IIfinal):
-            for a in self.alphabet:
-                next_state = None
-                for transition in self.dfa.transitions:
-                    if transition.tail_id == representatives[i] and transition.using == a:
-                        next_state = transition.head_id
-                        break
-                for j, next_group in enumerate(IIfinal):
-                    if next_state in next_group:
-                        transitions.append(Transition(
-                            representatives[i], representatives[j], a))
-                        break
-
+        for block, i in representatives.items():
+            for k, a in enumerate(symbols):
+                j = delta[k][i]
+                if blockOf[j] in representatives:
+                    transitions.append(Transition(
+                        states[i].id, states[representatives[blockOf[j]]].id, a))
+
+        start_state = states[representatives[blockOf[initial]]].id
         self.initialState = State(start_state, start_state, initial=True)
-        self.states = [State(representative, representative)
-                       for representative in representatives]
-        self.acceptanceStates = [
-            state for state in self.states if state.id in acceptance_states]
+        self.states = [State(states[i].id, states[i].id)
+                       for i in representatives.values()]
+        self.acceptanceStates = [state for state, i in zip(
+            self.states, representatives.values()) if i in accepting]
         self.transitions = transitions
 
-    '''
-    ↓↓ ALGORITHMS ↓↓
-    '''
-
-    def partition(self, II: list[list[int]]):
-        IInew = []
-        for G in II:
-            subgroups = {}
-            for id in G:
-                key = []
-                for a in self.alphabet:
-                    next_state = None
-                    for transition in self.dfa.transitions:
-                        if transition.tail_id == id and transition.using == a:
-                            next_state = transition.head_id
-                            break
-                    for i, group in enumerate(II):
-                        if next_state in group:
-                            if i != id:
-                                key.append(i)
-                                break
-                key = tuple(key)
-                if key not in subgroups:
-                    subgroups[key] = []
-                subgroups[key].append(id)
-
-            IInew.extend(subgroups.values())
-
-        return IInew
-    '''
-    ↑↑ END ALGORITHMS ↑↑
-    '''
+    def nest(self, leftMatch: str, rightMatch: str) -> None:
+        '''
+        This method is made for turn on the nested mode, where the delimiters must be balanced.
 
-    def simulate(self, input: list):
+        Specific: Precompile the row each delimiter leads to from every row. A delimiter without a transition keeps the row,
+        and a right delimiter only moves the row when it closes the outermost one.
+        Parameters:
+        - leftMatch: The opening delimiter.
+        - rightMatch: The closing delimiter.
+        '''
+        self.nested = True
+        self.leftMatch = leftMatch
+        self.rightMatch = rightMatch
+
+        rows = range(len(self.states))
+        self.leftRows = array('i', rows)
+        self.rightRows = array('i', rows)
+        for delimiter, delimiterRows in [(leftMatch, self.leftRows), (rightMatch, self.rightRows)]:
+            column = self.columnOfCode(ord(delimiter))
+            if column < 0:
+                continue
+            for row in rows:
+                following = self.table[row * self.width + column]
+                if following >= 0:
+                    delimiterRows[row] = following
+
+    def simulate(self, input: list, start: int = 0):
         if not self.nested:
-            return super().simulate(input)
+            return super().simulate(input, start)
         else:
-            return self.nestedSimulation(input)
+            return self.nestedSimulation(input, start)
 
-    def nestedSimulation(self, input: list):
+    def nestedSimulation(self, input: list, start: int = 0):
         '''
         This method is made for simulate the automaton with nested mode.
+
+        Specific: A depth counter replaces the stack of delimiters, the delimiters move through the rows compiled by nest()
+        and any other character through the table, so a block is scanned in linear time.
+        Returns:
+        - (True, end of the longest accepted prefix with every delimiter closed), else (False, position where it got stuck).
         '''
         start_time = time.perf_counter()
-        statePointer = self.initialState.id
-
-        rightMatch = str(ord(self.rightMatch))
-        leftMatch = str(ord(self.leftMatch))
-
-        stack = []
-        for idx, c in enumerate(input):
+        table, width = self.table, self.width
+        byteColumns, columnOfCode = self.byteColumns, self.columnOfCode
+        leftRows, rightRows, acceptRows = self.leftRows, self.rightRows, self.acceptRows
+        leftMatch, rightMatch = ord(self.leftMatch), ord(self.rightMatch)
+        row = self.startRow
+
+        depth = 0
+        lastEnd = None
+        for idx in range(start, len(input)):
+            c = input[idx]
             if c == leftMatch:
-                stack.append(c)
-                for transition in self.transitions:
-                    if transition.tail_id == statePointer and transition.using == c:
-                        statePointer = transition.head_id
-                        break
-            elif c == rightMatch:
-                if not stack or stack[-1] != leftMatch:
-                    return False, idx
-                stack.pop()
-                if not stack:  # We've finished a complete match
-                    for transition in self.transitions:
-                        if transition.tail_id == statePointer and transition.using == c:
-                            statePointer = transition.head_id
-                            break
+                depth += 1
+                row = leftRows[row]
+                continue
+            if c == rightMatch:
+                if depth == 0:
+                    break
+                depth -= 1
+                if depth:
+                    continue
+                # We've finished a complete match
+                row = rightRows[row]
             else:
-                found = False
-                for transition in self.transitions:
-                    if transition.tail_id == statePointer and transition.using == c:
-                        statePointer = transition.head_id
-                        found = True
-                        break
-                if not found:
-                    return False, idx
+                column = byteColumns[c] if c < 256 else columnOfCode(c)
+                if column < 0:
+                    break
+                row = table[row * width + column]
+                if row < 0:
+                    break
+                if depth:
+                    continue
+            if acceptRows[row] == 1:
+                lastEnd = idx + 1
+        else:
+            idx = len(input)
         self.simulationTime = time.perf_counter() - start_time
-        return (statePointer in [state.id for state in self.acceptanceStates] and not stack), len(input)
+        if lastEnd is None:
+            return False, idx
+        return True, lastEnd
@@ -1,6 +1,7 @@
 from src.utils.patterns import Pattern
 from src.utils.structures.symbol import Symbol
 from src._expression import Expression
+from src._union_dfa import UnionDeterministicFiniteAutomaton as UnionDFA
 from src.utils.tools import errorsManager
 
 
@@ -9,6 +10,9 @@ class Tokenizer(object):
     This class represents the lexer module.
     '''
 
+    # The union automaton of each list of patterns, shared by every tokenizer
+    unions: dict = {}
+
     def __init__(self, sourceCode: str = None, useExtraSoftCodify: bool = False):
         '''
         This is the constructor of the class.
@@ -111,6 +115,19 @@ class Tokenizer(object):
         '''
         self.sequences[sequenceID] = sequence
 
+    def unionAutomaton(self, patterns: list[Pattern]) -> UnionDFA:
+        '''
+        This function returns the automaton joining the given patterns, built the first time a tokenizer uses them.
+        Parameters:
+        - patterns: The patterns to join, in priority order.
+        '''
+        key = tuple(pattern.pattern for pattern in patterns)
+        union = Tokenizer.unions.get(key)
+        if union is None:
+            union = UnionDFA([pattern.min_dir_dfa for pattern in patterns])
+            Tokenizer.unions[key] = union
+        return union
+
     def tokenize(self, usingLongestMatch: bool = True):
         '''
         This function tokenizes the source code.
@@ -120,33 +137,43 @@ class Tokenizer(object):
         forward = 0
         # Strategy:
         # 1. Iterate over the source code.
-        # 2. For each character in the source code, check if the current character is a prefix of any pattern.
-        # This will be done by sending the entire source code to the DFAs of each pattern.
-        # If it is true, then we will get the longest match, and update the lexemeBegin and forward pointers.
+        # 2. At each position, run the union of the patterns from the current character until every pattern is stuck.
+        # The pattern that got the farthest is the longest match, the first one registered wins the ties.
+        # The nested patterns count their delimiters, they are simulated on their own and compared the same way.
 
         codified = self.codified
         unCodified = self.unCodified
 
+        patterns = list(self.patterns.values())
+        joined = [pattern for pattern in patterns if not pattern.nested]
+        priorityOf = [priority for priority,
+                      pattern in enumerate(patterns) if not pattern.nested]
+        nested = [(priority, pattern) for priority,
+                  pattern in enumerate(patterns) if pattern.nested]
+        union = self.unionAutomaton(joined) if joined else None
+
         while forward < len(codified):
             match = None
-            for pattern in self.patterns.values():
-                _, idx = pattern.min_dir_dfa.simulate(
-                    codified[forward:]
-                )
-                if match is None:
-                    if idx > 0:
-                        match = (pattern.name, idx)
-                else:
-                    if usingLongestMatch:
-                        if idx > match[1]:
-                            match = (pattern.name, idx)
-                    else:
-                        if idx < match[1] and idx > 0:
-                            match = (pattern.name, idx)
+            found = union.match(codified, forward,
+                                usingLongestMatch) if union else None
+            if found is not None:
+                match = (priorityOf[found[0]], found[1] - forward)
+            for priority, pattern in nested:
+                # The end of the balanced block, or where it got stuck like the union
+                _, end = pattern.min_dir_dfa.simulate(codified, forward)
+                idx = end - forward
+                if idx == 0:
+                    continue
+                if match is None or (idx == match[1] and priority < match[0]):
+                    match = (priority, idx)
+                elif usingLongestMatch and idx > match[1]:
+                    match = (priority, idx)
+                elif not usingLongestMatch and idx < match[1]:
+                    match = (priority, idx)
             if match is not None:
                 # Save also the original
                 self.symbolsTable.append(Symbol(
-                    match[0], codified[forward:forward + match[1]], unCodified[forward:forward + match[1]], forward))
+                    patterns[match[0]].name, codified[forward:forward + match[1]], unCodified[forward:forward + match[1]], forward))
                 forward += match[1]
             else:
                 self.errorsManager.addError(
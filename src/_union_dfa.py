@@ -0,0 +1,159 @@
+from .models._automaton import Automaton
+from .utils.structures.transition import Transition
+from .utils.structures.state import State
+from .utils.structures.char_class import CharClass
+from collections import deque
+
+
+class UnionDeterministicFiniteAutomaton(Automaton):
+    '''
+    This class represents the union of several automata, it runs all of them in a single scan.
+    '''
+
+    def __init__(self, automata: list[Automaton]) -> None:
+        '''
+        This is the constructor of the class.
+        Parameters:
+        - automata: The automata to join, in priority order. The first one wins the ties.
+        '''
+        super().__init__()
+
+        self.automata: list[Automaton] = automata
+        self.columnsOf: dict = {}
+        self.aliveMasks: list[int] = []
+        self.acceptMasks: list[int] = []
+
+        self.preprocess()
+        self.build()
+        self.compile()
+        self.postprocessing()
+
+    def __getstate__(self) -> dict:
+        '''
+        The joined automata are left out of the pickle, the union does not need them once built.
+        '''
+        state = self.__dict__.copy()
+        state['automata'] = None
+        return state
+
+    def preprocess(self):
+        '''
+        This method is made for preprocess the automaton.
+
+        Specific: Split the codes into the classes that every automaton sends to the same column,
+        sweeping the bounds of all their character ranges.
+        '''
+        bounds = set()
+        for automaton in self.automata:
+            for symbol in automaton.columnOf:
+                if isinstance(symbol, int):
+                    symbol = CharClass([(symbol, symbol)])
+                if isinstance(symbol, CharClass):
+                    for lo, hi in symbol:
+                        bounds.update((lo, hi + 1))
+
+        rangesOf = {}
+        bounds = sorted(bounds)
+        for lo, following in zip(bounds, bounds[1:]):
+            columns = tuple(automaton.columnOfCode(lo)
+                            for automaton in self.automata)
+            if any(column >= 0 for column in columns):
+                rangesOf.setdefault(columns, []).append((lo, following - 1))
+
+        self.columnsOf = {CharClass(ranges): columns for columns,
+                          ranges in rangesOf.items()}
+
+    def build(self):
+        '''
+        This method is made for build the automaton.
+
+        Specific: Product construction, a state is the tuple of the rows the automata are in, -1 for the ones already stuck.
+        Only the states reachable from the tuple of the start rows are built, a state where every automaton is stuck is the dead state.
+        '''
+        start = tuple(automaton.startRow for automaton in self.automata)
+        self.initialState = State(start, 0, initial=True)
+        self.states.append(self.initialState)
+
+        stateOf = {start: self.initialState}
+        unmarked = deque([self.initialState])
+        while unmarked:
+            S = unmarked.popleft()
+            S.marked = True
+            for symbol, columns in self.columnsOf.items():
+                U = tuple(
+                    automaton.table[row * automaton.width + column]
+                    if row >= 0 and column >= 0 else -1
+                    for automaton, row, column in zip(self.automata, S.value, columns))
+                if all(row < 0 for row in U):
+                    continue
+                T = stateOf.get(U)
+                if T is None:
+                    T = State(U, len(self.states))
+                    self.states.append(T)
+                    stateOf[U] = T
+                    unmarked.append(T)
+                self.transitions.append(Transition(S.id, T.id, symbol))
+
+        for state in self.states:
+            if any(row >= 0 and automaton.acceptRows[row] == 1
+                   for automaton, row in zip(self.automata, state.value)):
+                state.acceptance = True
+                self.acceptanceStates.append(state)
+
+    def postprocessing(self):
+        '''
+        This method is made for postprocessing the automaton.
+
+        Specific: Keep for every row the bitmask of the automata still running and of the ones accepting, bit k is the automaton k.
+        Then rename the state.value to the state.id.
+        '''
+        self.aliveMasks = [0] * len(self.states)
+        self.acceptMasks = [0] * len(self.states)
+        for state in self.states:
+            alive = accept = 0
+            for k, (automaton, row) in enumerate(zip(self.automata, state.value)):
+                if row >= 0:
+                    alive |= 1 << k
+                    if automaton.acceptRows[row] == 1:
+                        accept |= 1 << k
+            self.aliveMasks[self.rowOf[state.id]] = alive
+            self.acceptMasks[self.rowOf[state.id]] = accept
+            state.value = state.id
+
+    def match(self, input: list, start: int = 0, usingLongestMatch: bool = True):
+        '''
+        This function finds the automaton that matches at input[start:], the same one as simulating each automaton
+        from start and comparing how far each one got before it was stuck, in a single scan.
+        Parameters:
+        - input: The codified input.
+        - start: Where the match begins.
+        - usingLongestMatch: Keep the automaton that got the farthest, otherwise the one stuck the soonest after the first character.
+        Returns:
+        - (k, end) with the index of the automaton and the end of its match, None when every automaton is stuck on the first character.
+        '''
+        table, width = self.table, self.width
+        byteColumns, columnOfCode = self.byteColumns, self.columnOfCode
+        aliveMasks = self.aliveMasks
+        row = self.startRow
+        alive = aliveMasks[row]
+
+        for idx in range(start, len(input)):
+            c = input[idx]
+            column = byteColumns[c] if c < 256 else columnOfCode(c)
+            row = table[row * width + column] if column >= 0 else -1
+            following = aliveMasks[row] if row >= 0 else 0
+            if following != alive:
+                if idx == start:
+                    # The ones stuck on the first character do not match
+                    if not following:
+                        return None
+                elif not usingLongestMatch:
+                    stuck = alive & ~following
+                    return (stuck & -stuck).bit_length() - 1, idx
+                elif not following:
+                    return (alive & -alive).bit_length() - 1, idx
+            alive = following
+
+        if start >= len(input):
+            return None
+        return (alive & -alive).bit_length() - 1, len(input)
@@ -29,6 +29,7 @@ class YalSequencer(object):
             EXTRACT_REMINDER: None
         }
         self.idents: dict = {}
+        self.definitions: dict = {}
         self.exprContains: list[Pattern] = exprContains
         self.currentIdent: str = ""
         self.extract = extract
@@ -107,6 +108,8 @@ class YalSequencer(object):
 
         symbol: Symbol = self.lexer.symbolsTable[symbolsPointer]
         value = []
+        # The same value in pieces, (True, ident) for a reference and (False, text) otherwise
+        pieces = []
 
         # TODO: Here I stop, at this point I need to implement the extraction and recognition of EXPR
         lexer = Tokenizer()
@@ -132,10 +135,13 @@ class YalSequencer(object):
                     value.extend(
                         get_original
                     )
+                    pieces.append((True, subSymbol.original))
                 else:
                     value.extend(subSymbol.original)
+                    pieces.append((False, subSymbol.original))
 
         self.idents[self.currentIdent] = value
+        self.definitions[self.currentIdent] = pieces
 
         return True
 
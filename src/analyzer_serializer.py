@@ -1,9 +1,10 @@
 def generate_script(analyzer_path, output_file):
     code_template = """
 import argparse
+from collections import deque
 from colorama import Fore, Style
 
-from src.utils.tools import readFile, load_from_pickle
+from src.utils.tools import readFile, readChunks, load_from_pickle
 from src._dir_dfa import DirectDeterministicFiniteAutomaton as DFA
 from src._tokenizer import Tokenizer
 
@@ -40,41 +41,54 @@ def analyze(read_file_path, verb=True):
     tokenized = Tokenizer(fileContent, useExtraSoftCodify=True)
     unCodified = tokenized.unCodified
     codified = tokenized.codified
-    codified.append('#')
 
     structure: DFA = load_from_pickle(analyzer_file_path)
     vrint(f'✔ Analyzer loaded successfully from {{analyzer_file_path}}')
 
     vrint('-' * 10, 'ANALYSIS', '-' * 10)
 
-    forward = 0
-    while forward < len(fileContent):
-        match, idx = structure.specialSimulate(codified[forward:])
+    for match, forward, end in structure.tokens(codified):
         if match is False:
             vrint(Fore.RED + '✖ No match found!' + Style.RESET_ALL)
-            vrint(f'[{{forward}}:{{forward+idx}}]', 'No match')
+            vrint(f'[{{forward}}:{{end}}]', 'No match')
             vrint(Fore.YELLOW + 'Skipping this token...' + Style.RESET_ALL)
             vrint(Fore.RED + '-'*31)
             vrint('-'*31 + Style.RESET_ALL)
-            forward += 1
         else:
             vrint(Fore.GREEN + '✔ Match found!' + Style.RESET_ALL)
-            vrint(f'[{{forward}}:{{forward+idx}}]', match, '->', unCodified[forward:forward + idx])
-            symbolTable.append((match, unCodified[forward:forward + idx]))
+            vrint(f'[{{forward}}:{{end}}]', match, '->', unCodified[forward:end])
+            symbolTable.append((match, unCodified[forward:end]))
             vrint(Fore.YELLOW + 'Executing the attached python code...' + Style.RESET_ALL)
-            code = structure.returnDict[match][1:-1]
-            code = code.encode().decode('unicode_escape')
-            vrint(Fore.CYAN + 'Code to be executed:\\n' + code + Style.RESET_ALL)
+            vrint(Fore.CYAN + 'Code to be executed:\\n' + structure.actions.sources[match] + Style.RESET_ALL)
             try:
-                exec(code)
+                structure.actions.functions[match](unCodified[forward:end], forward, symbolTable)
             except Exception as e:
                 vrint(Fore.RED + 'On running return, found error:', e, Style.RESET_ALL)
-            forward += idx
             vrint(Fore.RED + '-'*31)
             vrint('-'*31 + Style.RESET_ALL)
     vrint('Analysis finished!')
     return symbolTable
 
+def stream(read_file_path, chunk_size=65536, table_size=1024):
+    analyzer_file_path = "{analyzer_path}"
+
+    structure: DFA = load_from_pickle(analyzer_file_path)
+    vrint(f'✔ Analyzer loaded successfully from {{analyzer_file_path}}')
+
+    # The actions get the last table_size symbols, a whole table would grow with the input
+    symbolTable = deque(maxlen=table_size)
+    for match, lexeme, offset in structure.stream(readChunks(read_file_path, chunk_size)):
+        if match is False:
+            vrint(Fore.RED + '✖ No match found!' + Style.RESET_ALL)
+            vrint(f'[{{offset}}]', 'No match')
+            continue
+        symbolTable.append((match, lexeme))
+        try:
+            structure.actions.functions[match](lexeme, offset, symbolTable)
+        except Exception as e:
+            vrint(Fore.RED + 'On running return, found error:', e, Style.RESET_ALL)
+        yield match, lexeme, offset
+
 def main():
     symbolTable = []
     parser = argparse.ArgumentParser(description="Lexer Analyzer")
@@ -82,6 +96,8 @@ def main():
                         help='The .txt to tokenize')  # Read from file
     parser.add_argument('verbose', type=str2bool,
                         help='A boolean flag to show the logs or not.')  # Show logs
+    parser.add_argument('--stream', action='store_true',
+                        help='Print the tokens as they are read, in bounded memory.')  # Stream mode
 
     args = parser.parse_args()
 
@@ -89,7 +105,11 @@ def main():
     verbose = args.verbose
     
     read_file_path = args.read_file_path
-    print(analyze(read_file_path, verbose))
+    if args.stream:
+        for token in stream(read_file_path):
+            print(token)
+    else:
+        print(analyze(read_file_path, verbose))
 
 
 if __name__ == "__main__":
@@ -100,3 +120,241 @@ if __name__ == "__main__":
         file.write(code_template.format(analyzer_path=analyzer_path))
 
     return output_file
+
+
+def compact_literal(values: list, width: int = 20, largest: int = None) -> tuple[str, int]:
+    '''
+    Returns the source of a bytes literal for the values when they fit in a byte, else of a tuple, and its sentinel.
+    Missing values (None or negative) become the sentinel, 255 for bytes and -1 for tuples.
+    largest bounds other values compared with the sentinel, when it does not fit in a byte a tuple is used.
+    '''
+    if (largest is None or largest < 255) and all(value is None or value < 255 for value in values):
+        data = bytes(255 if value is None or value <
+                     0 else value for value in values)
+        lines = [repr(data[i:i + width * 4])
+                 for i in range(0, len(data), width * 4)] or ["b''"]
+        return '(\n' + ''.join(f'    {line}\n' for line in lines) + ')', 255
+    items = [str(-1 if value is None else value) for value in values]
+    lines = [', '.join(items[i:i + width]) + ','
+             for i in range(0, len(items), width)]
+    return '(\n' + ''.join(f'    {line}\n' for line in lines) + ')', -1
+
+
+def generate_standalone_script(structure, output_file):
+    '''
+    Writes a lexer module with the compiled table and the RETURN actions inlined.
+    It does not import the generator package nor load a pickle, so it can be shipped alone.
+    '''
+    byte_columns = list(structure.byteColumns)
+    table = [structure.table[i] for i in range(len(structure.table))]
+    columns_literal, no_column = compact_literal(
+        byte_columns, largest=structure.width - 1)
+    table_literal, dead = compact_literal(table)
+
+    action_names = {token: f'{token}_action' for token in structure.returnDict}
+    actions_literal = '\n\n\n'.join(
+        structure.actions.definition(structure.actions.sources[token], name)
+        for token, name in action_names.items())
+    actions_dict_literal = '{\n' + ''.join(
+        f'    {token!r}: {name},\n' for token, name in action_names.items()) + '}'
+
+    code_template = '''"""
+Lexical analyzer generated by yalex.py.
+It is standalone: the transition table and the RETURN actions are inlined below.
+"""
+
+import argparse
+from array import array
+from bisect import bisect_right
+from collections import deque
+
+# Column of each byte code, NO_COLUMN when no transition uses it
+NO_COLUMN = {no_column}
+COLUMNS = {columns}
+# Column of the codes above 255, by sorted ranges WIDE_STARTS[k]..WIDE_ENDS[k]
+WIDE_STARTS = {wide_starts}
+WIDE_ENDS = {wide_ends}
+WIDE_COLUMNS = {wide_columns}
+
+# TABLE[row * WIDTH + column] is the next row, DEAD when there is none
+DEAD = {dead}
+WIDTH = {width}
+START = {start}
+TABLE = {table}
+
+# Token accepted by each row
+ACCEPT = {accept}
+
+
+{actions}
+
+
+ACTIONS = {actions_dict}
+
+
+def str2bool(v):
+    if isinstance(v, bool):
+        return v
+    if v.lower() in ('yes', 'true', 't', 'y', '1'):
+        return True
+    elif v.lower() in ('no', 'false', 'f', 'n', '0'):
+        return False
+    else:
+        raise argparse.ArgumentTypeError('Boolean value expected.')
+
+
+verbose = True
+
+
+def vrint(*args):
+    if verbose:
+        print(*args)
+
+
+def codify(text):
+    try:
+        return text.encode('latin-1')
+    except UnicodeEncodeError:
+        return array('I', map(ord, text))
+
+
+def wide_column(code):
+    k = bisect_right(WIDE_STARTS, code) - 1
+    if k >= 0 and code <= WIDE_ENDS[k]:
+        return WIDE_COLUMNS[k]
+    return NO_COLUMN
+
+
+def scan(buffer, start, end, final=True):
+    row = START
+    last_token, last_end = False, start
+    position = start
+    while position < end:
+        code = buffer[position]
+        column = COLUMNS[code] if code < 256 else wide_column(code)
+        if column == NO_COLUMN:
+            break
+        row = TABLE[row * WIDTH + column]
+        if row == DEAD:
+            break
+        position += 1
+        if ACCEPT[row] is not None:
+            last_token, last_end = ACCEPT[row], position
+    else:
+        if not final:
+            return None, end
+    if last_token is False:
+        return False, position
+    return last_token, last_end
+
+
+def tokens(buffer, final=True):
+    forward, end = 0, len(buffer)
+    while forward < end:
+        token, position = scan(buffer, forward, end, final)
+        if token is None:
+            return
+        if token is False:
+            yield False, forward, position
+            forward += 1
+        else:
+            yield token, forward, position
+            forward = position
+
+
+def analyze(read_file_path, verb=True):
+    global verbose
+    verbose = verb
+    symbolTable = []
+    with open(read_file_path, 'r', encoding='utf-8') as f:
+        fileContent = f.read()
+    vrint(f'✔ File read successfully from {{read_file_path}}')
+
+    if len(fileContent) == 0:
+        vrint('✖ File is empty!')
+        return
+
+    for match, forward, end in tokens(codify(fileContent)):
+        if match is False:
+            vrint(f'✖ No match found! [{{forward}}:{{end}}], skipping this token...')
+            continue
+        lexeme = fileContent[forward:end]
+        vrint(f'✔ Match found! [{{forward}}:{{end}}]', match, '->', lexeme)
+        symbolTable.append((match, lexeme))
+        try:
+            ACTIONS[match](lexeme, forward, symbolTable)
+        except Exception as e:
+            vrint('On running return, found error:', e)
+    vrint('Analysis finished!')
+    return symbolTable
+
+
+def stream(read_file_path, chunk_size=65536, table_size=1024):
+    # The actions get the last table_size symbols, a whole table would grow with the input
+    symbolTable = deque(maxlen=table_size)
+    pending, offset = '', 0
+    with open(read_file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            final = not chunk
+            pending += chunk
+            forward = 0
+            for match, start, end in tokens(codify(pending), final):
+                forward = start + 1 if match is False else end
+                if match is False:
+                    vrint(f'✖ No match found! [{{offset + start}}]')
+                    continue
+                lexeme = pending[start:end]
+                symbolTable.append((match, lexeme))
+                try:
+                    ACTIONS[match](lexeme, offset + start, symbolTable)
+                except Exception as e:
+                    vrint('On running return, found error:', e)
+                yield match, lexeme, offset + start
+            pending = pending[forward:]
+            offset += forward
+            if final:
+                break
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexer Analyzer")
+    parser.add_argument('read_file_path', type=str,
+                        help='The .txt to tokenize')  # Read from file
+    parser.add_argument('verbose', type=str2bool,
+                        help='A boolean flag to show the logs or not.')  # Show logs
+    parser.add_argument('--stream', action='store_true',
+                        help='Print the tokens as they are read, in bounded memory.')  # Stream mode
+
+    args = parser.parse_args()
+
+    global verbose
+    verbose = args.verbose
+
+    if args.stream:
+        for token in stream(args.read_file_path):
+            print(token)
+    else:
+        print(analyze(args.read_file_path, verbose))
+
+
+if __name__ == "__main__":
+    main()
+'''
+    with open(output_file, 'w', encoding='utf-8') as file:
+        file.write(code_template.format(
+            no_column=no_column,
+            columns=columns_literal,
+            wide_starts=repr(tuple(structure.wideStarts)),
+            wide_ends=repr(tuple(structure.wideEnds)),
+            wide_columns=repr(tuple(structure.wideColumns)),
+            dead=dead,
+            width=structure.width,
+            start=structure.startRow,
+            table=table_literal,
+            accept=repr(tuple(structure.acceptTokens)),
+            actions=actions_literal,
+            actions_dict=actions_dict_literal,
+        ))
+
+    return output_file
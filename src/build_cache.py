@@ -0,0 +1,108 @@
+"""
+@File name: build_cache.py
+@Module: Build Cache
+@Description: This file contains the content addressed cache of the analyzers built by yalex.
+"""
+
+import glob
+import hashlib
+import os
+import pickle as pkl
+import sys
+
+CACHE_DIR_VARIABLE = 'YALEX_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'yalex')
+MAX_ENTRIES = 64
+MAX_BYTES = 64 * 1024 * 1024
+
+_fingerprint = None
+
+
+def cache_dir() -> str:
+    '''
+    Returns the cache directory, YALEX_CACHE_DIR when it is set.
+    '''
+    return os.environ.get(CACHE_DIR_VARIABLE) or DEFAULT_CACHE_DIR
+
+
+def generator_fingerprint() -> str:
+    '''
+    Returns a hash of the generator sources, so any change to the generator invalidates the cache.
+    '''
+    global _fingerprint
+    if _fingerprint is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(root, 'src', '**', '*.py'), recursive=True) + [os.path.join(root, 'yalex.py')]):
+            with open(path, 'rb') as f:
+                digest.update(os.path.relpath(path, root).encode())
+                digest.update(f.read())
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+
+def cache_key(content: str) -> str:
+    '''
+    Returns the key of a .yal content, built from the content, the generator and the python version.
+    '''
+    digest = hashlib.sha256()
+    digest.update(generator_fingerprint().encode())
+    digest.update(sys.version.encode())
+    digest.update(content.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_cached(key: str):
+    '''
+    Returns the analyzer stored under the key, None on a miss. A hit refreshes the entry for the LRU order.
+    '''
+    path = os.path.join(cache_dir(), f'{key}.pkl')
+    try:
+        with open(path, 'rb') as f:
+            structure = pkl.load(f)
+        os.utime(path)
+    except Exception:
+        # A missing, truncated or stale entry is a miss, the next store replaces it
+        return None
+    return structure
+
+
+def store_cached(key: str, structure, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+    '''
+    Stores the analyzer under the key and prunes the cache. The file is written aside and renamed, so concurrent builds never read half an entry.
+    '''
+    directory = cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{key}.pkl')
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as f:
+            pkl.dump(structure, f)
+        os.replace(temporary, path)
+        prune(directory, max_entries, max_bytes)
+    except OSError:
+        # The cache is an optimization, a read only or full disk only disables it
+        pass
+
+
+def prune(directory: str, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+    '''
+    Removes the least recently used entries until the cache fits in max_entries and max_bytes.
+    '''
+    entries = []
+    for path in glob.glob(os.path.join(directory, '*.pkl')):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    entries.sort(reverse=True)
+
+    total = 0
+    for idx, (_, size, path) in enumerate(entries):
+        total += size
+        if idx >= max_entries or total > max_bytes:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
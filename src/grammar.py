@@ -1,4 +1,7 @@
-from graphviz import Digraph
+from src.utils.tools import iterateBits
+
+# The terminal at the end of every input
+END_MARKER = '$'
 
 
 class Grammar(object):
@@ -7,6 +10,7 @@ class Grammar(object):
         self.start_symbol = productions[0][0]
         self.nonterminals = {prod[0] for prod in productions}
         self.relations = []
+        self.index_productions()
 
     def augment(self) -> None:
         new_start_symbol = f"{self.start_symbol}'"
@@ -14,101 +18,154 @@ class Grammar(object):
         self.productions.insert(0, new_start_production)
         self.nonterminals.add(new_start_symbol)
         self.start_symbol = new_start_symbol
+        self.index_productions()
 
-    def closure(self, items) -> None:
-        items = [
-            (item[0], item[1], item[2]) for item in items
-        ]
-
-        closure_set = set(items)
-        kernel_items = set()
-
-        for item in items:
-            kernel_items.add(item)
-
-        while True:
-            new_items = set()
-            for (head, body, dot_position) in closure_set:
-                # Only proceed if the dot is before a non-terminal and not at the end of the production
-                if dot_position < len(body) and body[dot_position] in self.nonterminals:
-                    B = body[dot_position]
-                    for production in self.productions:
-                        if production[0] == B:
-                            # For each production B -> γ, add B -> .γ to the closure if not already present
-                            new_item = (B, production[1], 0)
-                            if new_item not in closure_set:
-                                # And is not empty
-                                new_items.add(new_item)
-
-                    if dot_position > 0:
-                        kernel_items.add((head, body, dot_position))
-
-            if not new_items:
-                break
-
-            closure_set.update(new_items)
-
-        non_kernel_items = closure_set - kernel_items
+    def index_productions(self) -> None:
+        """
+        Indexing the productions by head and numbering their items, forgetting the closures computed with the previous ones.
+        The item A -> α • β of the production p is the int item_base[p] + len(α)
+        """
+        self.productions_by_head = {head: [] for head in self.nonterminals}
+        seen = set()
+        for idx, production in enumerate(self.productions):
+            # A repeated production would only repeat its items
+            if production not in seen:
+                seen.add(production)
+                self.productions_by_head[production[0]].append(idx)
+
+        self.item_base = []
+        self.item_production = []
+        self.item_dot = []
+        self.item_next = []
+        for idx, (head, body) in enumerate(self.productions):
+            self.item_base.append(len(self.item_production))
+            for dot_position in range(len(body) + 1):
+                self.item_production.append(idx)
+                self.item_dot.append(dot_position)
+                self.item_next.append(
+                    body[dot_position] if dot_position < len(body) else None)
+
+        self.nonterminal_closures = {}
+
+    def nonterminal_closure(self, symbol) -> frozenset:
+        """
+        The items B -> • γ of every production reachable from the productions of the non-terminal, computed once per non-terminal
+        """
+        closure_set = self.nonterminal_closures.get(symbol)
+        if closure_set is not None:
+            return closure_set
 
         closure_set = set()
+        pending = [symbol]
+        expanded = {symbol}
+        while pending:
+            B = pending.pop()
+            for idx in self.productions_by_head[B]:
+                body = self.productions[idx][1]
+                # For each production B -> γ, add B -> • γ to the closure
+                closure_set.add(self.item_base[idx])
+                # Only the new non-terminals after the dot are expanded
+                if body and body[0] in self.nonterminals and body[0] not in expanded:
+                    expanded.add(body[0])
+                    pending.append(body[0])
+
+        closure_set = frozenset(closure_set)
+        self.nonterminal_closures[symbol] = closure_set
+        return closure_set
 
-        # To all the non_kernel_items add the 4th parameter as False
-        for item in non_kernel_items:
-            head, body, dot_position = item
-            if body != ():  # Removing the empty ones
-                closure_set.add((head, body, dot_position, False))
+    def item_closure(self, kernel) -> set:
+        """
+        The closure of a kernel of int items, each non-terminal after a dot brings its memoized closure, already closed itself
+        """
+        closure_set = set(kernel)
+        for item in kernel:
+            symbol = self.item_next[item]
+            if symbol in self.nonterminals:
+                closure_set |= self.nonterminal_closure(symbol)
+        return closure_set
 
-        # To all the kernel_items add the 4th parameter as True
-        for item in kernel_items:
-            head, body, dot_position = item
-            closure_set.add((head, body, dot_position, True))
+    def encode_item(self, item) -> int:
+        head, body, dot_position = item[0], item[1], item[2]
+        for idx in self.productions_by_head[head]:
+            if self.productions[idx][1] == body:
+                return self.item_base[idx] + dot_position
+        raise ValueError(f'{head} -> {" ".join(body)} is not a production')
 
-        return closure_set
+    def decode_items(self, closure_set, kernel) -> set:
+        """
+        Converting the int items back to (head, body, dot_position, is_kernel), without the empty non-kernel ones
+        """
+        items = set()
+        for item in closure_set:
+            head, body = self.productions[self.item_production[item]]
+            if item in kernel:
+                items.add((head, body, self.item_dot[item], True))
+            elif body != ():  # Removing the empty ones
+                items.add((head, body, self.item_dot[item], False))
+        return items
+
+    def closure(self, items) -> None:
+        kernel = {self.encode_item(item) for item in items}
+        return self.decode_items(self.item_closure(kernel), kernel)
 
     def goto(self, items, symbol) -> None:
-        goto_items = set()
+        kernel = set()
 
         for item in items:
             head, body, dot_position, is_kernel = item
             if dot_position < len(body) and body[dot_position] == symbol:
-                new_item = (head, body, dot_position + 1, True)
-                goto_items |= self.closure({new_item})
+                kernel.add(self.encode_item(item) + 1)
 
-        return goto_items
+        # A single closure of the whole kernel, instead of one per item
+        return self.decode_items(self.item_closure(kernel), kernel) if kernel else set()
 
     def items(self, symbols):
+        """
+        The canonical collection of LR(0) items, the sets in C and the relations (I, J, X) of their GOTOs.
+        The states are keyed by their kernel of int items, and each one computes all of its GOTOs once in a single pass over its items.
+        The collection also stays as int items in self.kernels, self.item_sets and self.gotos
+        """
         relations = []
-
-        C = [self.closure(
-            {(self.start_symbol, self.productions[0][1], 0, True)})]
-
-        # A dictionary to map sets in C to their indices
-        set_indices = {frozenset(C[0]): 0}
-
-        while True:
-            new_sets_added = False
-            for I_index, I in enumerate(C):
-                for X in symbols:
-                    goto_set = self.goto(I, X)
-                    goto_frozenset = frozenset(goto_set)
-
-                    if goto_set:
-                        if goto_frozenset not in set_indices:
-                            C.append(goto_set)
-                            set_indices[goto_frozenset] = len(C) - 1
-                            new_sets_added = True
-                        # Regardless of whether it's new or existing, record the transition
-                        relations.append(
-                            (I_index, set_indices[goto_frozenset], X))
-
-                        for item in goto_set:
-                            # Check have start symbol in the head and dot is at the end of the production
-                            if item[0] == self.start_symbol and item[2] == len(item[1]):
-                                relations.append(
-                                    (set_indices[goto_frozenset], 'accept', ''))
-                                continue
-            if not new_sets_added:
-                break
+        order = {symbol: idx for idx, symbol in enumerate(symbols)}
+
+        start_kernel = frozenset([self.item_base[0]])
+        self.kernels = [start_kernel]
+        self.item_sets = []
+        self.gotos = []
+        state_of = {start_kernel: 0}
+
+        I_index = 0
+        while I_index < len(self.kernels):
+            closure_set = self.item_closure(self.kernels[I_index])
+            self.item_sets.append(closure_set)
+
+            # The kernel of every GOTO(I, X), moving the dot over X
+            goto_kernels = {}
+            for item in closure_set:
+                X = self.item_next[item]
+                if X in order:
+                    goto_kernels.setdefault(X, set()).add(item + 1)
+
+            gotos = {}
+            for X in sorted(goto_kernels, key=order.get):
+                goto_kernel = frozenset(goto_kernels[X])
+                J_index = state_of.get(goto_kernel)
+                if J_index is None:
+                    J_index = len(self.kernels)
+                    self.kernels.append(goto_kernel)
+                    state_of[goto_kernel] = J_index
+                gotos[X] = J_index
+                relations.append((I_index, J_index, X))
+
+                # Check have start symbol in the head and dot is at the end of the production
+                if any(self.item_next[item] is None and self.productions[self.item_production[item]][0] == self.start_symbol
+                       for item in goto_kernel):
+                    relations.append((J_index, 'accept', ''))
+            self.gotos.append(gotos)
+            I_index += 1
+
+        C = [self.decode_items(closure_set, kernel)
+             for closure_set, kernel in zip(self.item_sets, self.kernels)]
 
         # Avoid duplicates in relations
         relations = list(set(relations))
@@ -143,6 +200,8 @@ class Grammar(object):
         return f'{combined_str}'
 
     def draw(self, C, relations, label: str = None):
+        from graphviz import Digraph
+
         G = Digraph(
             graph_attr={'rankdir': 'TB'},
             node_attr={'shape': 'record'}
@@ -172,40 +231,195 @@ class Grammar(object):
     def compute_first(self):
 
         self.first_sets = {symbol: set() for symbol in self.nonterminals}
-        # Initialize FIRST for terminals in each production
+
+        # The non-terminals that can derive ε, until no production adds one
+        nullable = set()
+        changed = True
+        while changed:
+            changed = False
+            for head, production in self.productions:
+                if head not in nullable and all(symbol in nullable for symbol in production):
+                    nullable.add(head)
+                    changed = True
+
+        # For each A -> α X β with α nullable, a terminal X is in FIRST(A) and a non-terminal X brings its FIRST
+        inherits = {symbol: set() for symbol in self.nonterminals}
         for head, production in self.productions:
             for symbol in production:
-                if symbol not in self.nonterminals:  # Terminal found directly in production
+                if symbol not in self.nonterminals:  # Terminal found after the nullable prefix
                     self.first_sets[head].add(symbol)
                     break  # Stop at the first terminal since it determines the FIRST set directly
+                if symbol != head:
+                    inherits[symbol].add(head)
+                if symbol not in nullable:
+                    break
+            else:
+                # If all symbols can derive ε, add ε to FIRST(head)
+                self.first_sets[head].add('ε')
+
+        # Propagate the FIRST sets from every changed non-terminal to the ones that inherit it
+        pending = list(self.nonterminals)
+        while pending:
+            symbol = pending.pop()
+            non_epsilon = self.first_sets[symbol] - {'ε'}
+            for head in inherits[symbol]:
+                first_len_before = len(self.first_sets[head])
+                self.first_sets[head].update(non_epsilon)
+                if first_len_before != len(self.first_sets[head]):
+                    pending.append(head)
+
+    def first_of_sequence(self, symbols) -> set:
+        """
+        FIRST of a sequence of symbols, with 'ε' when all of them can derive ε
+        """
+        first = set()
+        for symbol in symbols:
+            if symbol not in self.nonterminals:
+                first.add(symbol)
+                return first
+            first.update(self.first_sets[symbol] - {'ε'})
+            if 'ε' not in self.first_sets[symbol]:
+                return first
+        first.add('ε')
+        return first
 
-        # Iteratively propagate FIRST sets based on non-terminals
+    def compute_follow(self):
+        if not hasattr(self, 'first_sets'):
+            self.compute_first()
+
+        self.follow_sets = {symbol: set() for symbol in self.nonterminals}
+        # The end of the input follows the start symbol
+        self.follow_sets[self.start_symbol].add(END_MARKER)
+
+        # For each A -> α B β, FIRST(β) without ε is in FOLLOW(B), and FOLLOW(A) too when β can derive ε
+        inherits = []
+        for head, production in self.productions:
+            for i, symbol in enumerate(production):
+                if symbol in self.nonterminals:
+                    first = self.first_of_sequence(production[i + 1:])
+                    self.follow_sets[symbol].update(first - {'ε'})
+                    if 'ε' in first and symbol != head:
+                        inherits.append((head, symbol))
+
+        # Iteratively propagate FOLLOW sets
         changed = True
         while changed:
             changed = False
-            for head, production in self.productions:
-                first_len_before = len(self.first_sets[head])
-                i = 0
-                while i < len(production):
-                    symbol = production[i]
-                    if symbol in self.nonterminals:
-                        # Add non-ε symbols from FIRST(symbol) to FIRST(head)
-                        non_epsilon = self.first_sets[symbol] - {'ε'}
-                        self.first_sets[head].update(non_epsilon)
-                        if 'ε' not in self.first_sets[symbol]:
-                            break
-                    else:
-                        # First terminal encountered determines the FIRST set
-                        self.first_sets[head].add(symbol)
-                        break
-                    i += 1
-                else:
-                    # If all symbols can derive ε, add ε to FIRST(head)
-                    self.first_sets[head].add('ε')
-
-                # Check if set changed in size
-                if first_len_before != len(self.first_sets[head]):
+            for head, symbol in inherits:
+                follow_len_before = len(self.follow_sets[symbol])
+                self.follow_sets[symbol].update(self.follow_sets[head])
+                if follow_len_before != len(self.follow_sets[symbol]):
                     changed = True
 
-    def compute_follow(self):
-        pass
+    def compute_lookaheads(self):
+        """
+        LALR(1) lookaheads of the LR(0) collection by DeRemer and Pennello, self.lookaheads[(state, production)]
+        are the terminals the production is reduced on in the state. No LR(1) state is ever built:
+        - DR(p, A): The terminals shifted right after the transition of p on the non-terminal A.
+        - Read(p, A): DR(p, A) and Read(r, C) for every nullable C after it, r = GOTO(p, A).
+        - Follow(p, A): Read(p, A) and Follow(p', B) for every B -> β A γ with γ nullable and p' reaching p over β.
+        - LA(q, A -> ω): Follow(p, A) of every p reaching q over ω.
+        The sets are int bitmasks over the terminals while they are propagated.
+        """
+        if not hasattr(self, 'first_sets'):
+            self.compute_first()
+
+        nullable = {symbol for symbol in self.nonterminals if 'ε' in self.first_sets[symbol]}
+
+        terminals = [END_MARKER]
+        bit_of = {END_MARKER: 1}
+
+        # Every transition on a non-terminal, (p, A) is the node transition_of[p][A]
+        transitions = []
+        transition_of = []
+        for state, gotos in enumerate(self.gotos):
+            transition_of.append({})
+            for symbol in gotos:
+                if symbol in self.nonterminals:
+                    transition_of[state][symbol] = len(transitions)
+                    transitions.append((state, symbol))
+                elif symbol not in bit_of:
+                    bit_of[symbol] = 1 << len(terminals)
+                    terminals.append(symbol)
+
+        # The terminals shifted from every state, DR(p, A) are the ones of GOTO(p, A)
+        shifted = [0] * len(self.gotos)
+        for state, gotos in enumerate(self.gotos):
+            for symbol in gotos:
+                if symbol not in self.nonterminals:
+                    shifted[state] |= bit_of[symbol]
+
+        read_sets = []
+        reads = []
+        for state, symbol in transitions:
+            target = self.gotos[state][symbol]
+            read_sets.append(shifted[target])
+            reads.append([transition_of[target][X] for X in self.gotos[target] if X in nullable])
+        # The end of the input is read after the start symbol of the augmented production
+        start_body = self.productions[0][1]
+        if start_body and start_body[0] in transition_of[0]:
+            read_sets[transition_of[0][start_body[0]]] |= bit_of[END_MARKER]
+        read_sets = digraph(reads, read_sets)
+
+        includes = [[] for _ in transitions]
+        lookbacks = {}
+        for node, (state, head) in enumerate(transitions):
+            for production in self.productions_by_head[head]:
+                body = self.productions[production][1]
+                current = state
+                for i, symbol in enumerate(body):
+                    if symbol in self.nonterminals and all(X in nullable for X in body[i + 1:]):
+                        includes[transition_of[current][symbol]].append(node)
+                    current = self.gotos[current][symbol]
+                lookbacks.setdefault((current, production), []).append(node)
+        follow_sets = digraph(includes, list(read_sets))
+
+        self.lookaheads = {}
+        for key, nodes in lookbacks.items():
+            lookahead = 0
+            for node in nodes:
+                lookahead |= follow_sets[node]
+            self.lookaheads[key] = {terminals[idx] for idx in iterateBits(lookahead)}
+
+
+def digraph(relation: list[list[int]], sets: list[int]) -> list[int]:
+    """
+    The Digraph algorithm of DeRemer and Pennello: every sets[x] gets the union of sets[y] of the y reachable from x in the relation.
+    A strongly connected component ends with one set for all, found with Tarjan's traversal, iterative so deep grammars do not hit the recursion limit.
+    """
+    done = len(relation) + 1
+    depth = [0] * len(relation)
+    stack = []
+    for root in range(len(relation)):
+        if depth[root]:
+            continue
+        stack.append(root)
+        depth[root] = len(stack)
+        work = [(root, len(stack), 0)]
+        while work:
+            x, x_depth, i = work[-1]
+            if i < len(relation[x]):
+                work[-1] = (x, x_depth, i + 1)
+                y = relation[x][i]
+                if depth[y] == 0:
+                    stack.append(y)
+                    depth[y] = len(stack)
+                    work.append((y, len(stack), 0))
+                    continue
+            else:
+                work.pop()
+                if depth[x] == x_depth:
+                    # x is the root of its component, which gets its set
+                    while True:
+                        top = stack.pop()
+                        depth[top] = done
+                        sets[top] = sets[x]
+                        if top == x:
+                            break
+                if not work:
+                    break
+                y, x = x, work[-1][0]
+            if depth[y] < depth[x]:
+                depth[x] = depth[y]
+            sets[x] |= sets[y]
+    return sets
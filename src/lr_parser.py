@@ -0,0 +1,156 @@
+"""
+@File name: lr_parser.py
+@Module: LR Parser
+@Description: This file contains the table driven shift-reduce parser that runs a ParseTable over the tokens of a lexer.
+"""
+
+from itertools import chain
+
+from src.grammar import END_MARKER
+from src.parse_table import ParseTable, ACCEPT
+from src.utils.tools import errorsManager
+
+# Column of the tokens that are skipped
+IGNORED = -1
+
+
+def build_node(head):
+    """
+    The default reduction of the productions of a head, a (head, children) tuple
+    """
+    def reduce(children):
+        return head, children
+    return reduce
+
+
+class LRParser(object):
+    """
+    This class represents the shift-reduce parser of an SLR(1) or LALR(1) table.
+    The tokens are (token, lexeme, ...) tuples, like the ones of YALEX_ANALYZER.analyze or DirDFA.stream,
+    and the token names of yalex are matched to the terminals by their exact name, else in uppercase like compare_tokens does.
+    """
+
+    def __init__(self, table: ParseTable, ignored_tokens=(), reductions: dict = None) -> None:
+        """
+        Parameters:
+        - table: The SLR(1) or LALR(1) table.
+        - ignored_tokens: The terminals skipped when they are read, the IGNORE ones of YAPAL.
+        - reductions: Callbacks by production (head, body), called with the list of the values of the body.
+          The productions without one build a (head, children) tuple.
+        """
+        self.table = table
+        self.errorsManager = errorsManager()
+
+        self.terminal_count = len(table.terminals)
+        self.ignored_tokens = {self.terminal_of(token) for token in ignored_tokens}
+        self.columns = {END_MARKER: table.column_of[END_MARKER]}
+
+        # Length, GOTO column and callback of every production, by production index
+        reductions = reductions or {}
+        self.lengths = [len(body) for _, body in table.productions]
+        self.goto_columns = [table.column_of.get(head, -1) for head, _ in table.productions]
+        self.callbacks = [reductions.get(production) or build_node(production[0])
+                          for production in table.productions]
+
+    def terminal_of(self, token: str) -> str:
+        """
+        The terminal of a token name, the name itself when the grammar has that terminal, else the name in uppercase
+        """
+        if self.table.column_of.get(token, self.terminal_count) < self.terminal_count:
+            return token
+        return token.upper()
+
+    def column_of_token(self, token) -> int:
+        """
+        The terminal column of a lexer token, IGNORED for the ignored ones and None for the ones that are not terminals.
+        The result is kept, so every token name is resolved once.
+        """
+        if not isinstance(token, str):
+            # The lexer yields False for the characters no token matches
+            return None
+        terminal = self.terminal_of(token)
+        if terminal in self.ignored_tokens:
+            column = IGNORED
+        else:
+            column = self.table.column_of.get(terminal)
+            if column is not None and column >= self.terminal_count:
+                column = None
+        self.columns[token] = column
+        return column
+
+    def position_of(self, entry: tuple, index: int) -> str:
+        """
+        The offset of the stream tuples, else the index of the token
+        """
+        return f'offset {entry[2]}' if len(entry) > 2 else f'token {index}'
+
+    def describe(self, entry: tuple, index: int) -> str:
+        """
+        The terminal, lexeme and position of a token for the syntax errors
+        """
+        token, lexeme = entry[0], entry[1]
+        if token == END_MARKER and lexeme is None:
+            return f'end of input ({END_MARKER})'
+        return f'{self.terminal_of(token)} {lexeme!r} at {self.position_of(entry, index)}'
+
+    def parse(self, tokens):
+        """
+        Parses the tokens, pulled from the iterable one at a time so a lexer generator is never turned into a list.
+        Returns the value of the start symbol, None on a syntax error, which is added to the errors manager.
+        """
+        table = self.table
+        base, values, check = table.base, table.values, table.check
+        size = len(check)
+        columns, column_of_token = self.columns, self.column_of_token
+        lengths, goto_columns, callbacks = self.lengths, self.goto_columns, self.callbacks
+
+        state = 0
+        states = [0]
+        stack = []
+        for index, entry in enumerate(chain(tokens, ((END_MARKER, None),))):
+            token = entry[0]
+            column = columns.get(token)
+            if column is None:
+                column = column_of_token(token)
+                if column is None:
+                    if isinstance(token, str):
+                        error = f'Unknown terminal {self.describe(entry, index)}, from the token {token!r}'
+                    else:
+                        error = f'No token matches {entry[1]!r} at {self.position_of(entry, index)}'
+                    self.errorsManager.addError(error, 'Parsing stopped')
+                    return None
+            if column == IGNORED:
+                continue
+
+            while True:
+                idx = base[state] + column
+                action = values[idx] if idx < size and check[idx] == state else 0
+                if action > 0:
+                    # Shift
+                    state = action - 1
+                    states.append(state)
+                    stack.append(entry[1])
+                    break
+                if action < ACCEPT:
+                    # Reduce by the production -action - 1
+                    production = -action - 1
+                    length = lengths[production]
+                    if length:
+                        children = stack[-length:]
+                        del stack[-length:]
+                        del states[-length:]
+                    else:
+                        children = []
+                    state = states[-1]
+                    stack.append(callbacks[production](children))
+                    idx = base[state] + goto_columns[production]
+                    state = values[idx] - 1
+                    states.append(state)
+                    continue
+                if action == ACCEPT:
+                    return stack[-1]
+
+                expected = [terminal for terminal in table.terminals if table.action(state, terminal)]
+                self.errorsManager.addError(
+                    f'Unexpected {self.describe(entry, index)} in I{state}, expected one of {expected}', 'Parsing stopped')
+                return None
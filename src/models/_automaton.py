@@ -1,6 +1,10 @@
 from src.utils.structures.state import State
 from src.utils.structures.transition import Transition
-from graphviz import Digraph
+from src.utils.structures.char_class import CharClass
+from src.utils.constants import HASHTAG
+from array import array
+from collections import defaultdict
+from bisect import bisect_right
 import time
 
 
@@ -16,6 +20,37 @@ class Automaton(object):
         self.transitions: list[Transition] = []
         self.simulationTime: float = 0
 
+        # Compiled table form, filled by compile()
+        self.table: array = array('i')
+        self.width: int = 0
+        self.columnOf: dict = {}
+        self.byteColumns: array = array('i')
+        self.wideStarts: list[int] = []
+        self.wideEnds: list[int] = []
+        self.wideColumns: list[int] = []
+        self.rowOf: dict = {}
+        self.startRow: int = -1
+        self.acceptRows: bytearray = bytearray()
+        self.acceptTokens: list[str] = []
+        self.deadRows: bytearray = bytearray()
+
+    def __setstate__(self, state: dict):
+        '''
+        Analyzers pickled before the current table existed are compiled when loaded.
+        The older ones keyed their transitions and alphabet by str codes like '97', they are turned into int codes first.
+        '''
+        self.__dict__.update(state)
+        legacy = False
+        for transition in self.transitions:
+            if isinstance(transition.using, str) and transition.using.isdigit():
+                transition.using = int(transition.using)
+                legacy = True
+        if getattr(self, 'alphabet', None):
+            self.alphabet = [int(symbol) if isinstance(symbol, str) and symbol.isdigit() else symbol
+                             for symbol in self.alphabet]
+        if legacy or 'deadRows' not in state:
+            self.compile()
+
     def preprocess(self):
         '''
         This method is made for preprocess the automaton.
@@ -40,10 +75,161 @@ class Automaton(object):
         '''
         raise NotImplementedError()
 
+    def compile(self):
+        '''
+        This method is made for compile the transitions into a dense table.
+
+        Specific: Each state gets a row and each symbol a column, table[row * width + column] holds the next row or -1.
+        The '#TOKEN' marker edges are not columns, they become the accept token of the row they leave.
+        The codes below 256 find their column in byteColumns, the others by bisection over the sorted wide ranges.
+        '''
+        self.rowOf = {state.id: row for row, state in enumerate(self.states)}
+        self.columnOf = {}
+        for transition in self.transitions:
+            if not self.isMarker(transition.using) and transition.using not in self.columnOf:
+                self.columnOf[transition.using] = len(self.columnOf)
+
+        self.width = len(self.columnOf)
+        self.byteColumns = array('i', [-1]) * 256
+        wide = []
+        for symbol, column in self.columnOf.items():
+            if isinstance(symbol, int):
+                symbol = CharClass([(symbol, symbol)])
+            if not isinstance(symbol, CharClass):
+                continue
+            for lo, hi in symbol:
+                for code in range(lo, min(hi, 255) + 1):
+                    self.byteColumns[code] = column
+                if hi > 255:
+                    wide.append((max(lo, 256), hi, column))
+        wide.sort()
+        self.wideStarts = [lo for lo, _, _ in wide]
+        self.wideEnds = [hi for _, hi, _ in wide]
+        self.wideColumns = [column for _, _, column in wide]
+
+        self.table = array('i', [-1]) * (len(self.states) * self.width)
+        self.acceptTokens = [None] * len(self.states)
+        for transition in self.transitions:
+            row = self.rowOf[transition.tail_id]
+            if self.isMarker(transition.using):
+                if self.acceptTokens[row] is None:
+                    self.acceptTokens[row] = transition.using[1:]
+            else:
+                self.table[row * self.width + self.columnOf[transition.using]
+                           ] = self.rowOf[transition.head_id]
+
+        self.acceptRows = bytearray(len(self.states))
+        for state in self.acceptanceStates:
+            self.acceptRows[self.rowOf[state.id]] = 1
+
+        self.startRow = self.rowOf[self.initialState.id]
+        self.deadRows = self.findDeadRows()
+
+    def findDeadRows(self) -> bytearray:
+        '''
+        This function returns a flag for every row that can not reach an accepting row, or a row with an accept token.
+        A simulation reaching one of them can stop, no longer prefix will be accepted.
+        '''
+        predecessors = [[] for _ in self.states]
+        for row in range(len(self.states)):
+            for column in range(self.width):
+                following = self.table[row * self.width + column]
+                if following >= 0:
+                    predecessors[following].append(row)
+
+        deadRows = bytearray([1]) * len(self.states)
+        pending = [row for row in range(len(self.states))
+                   if self.acceptRows[row] == 1 or self.acceptTokens[row] is not None]
+        for row in pending:
+            deadRows[row] = 0
+        while pending:
+            for previous in predecessors[pending.pop()]:
+                if deadRows[previous]:
+                    deadRows[previous] = 0
+                    pending.append(previous)
+        return deadRows
+
+    def columnOfCode(self, code: int) -> int:
+        '''
+        This function returns the column of a character code, -1 when no transition uses it.
+        '''
+        if code < 256:
+            return self.byteColumns[code]
+        k = bisect_right(self.wideStarts, code) - 1
+        if k >= 0 and code <= self.wideEnds[k]:
+            return self.wideColumns[k]
+        return -1
+
+    def refinePartition(self, delta: list[array], blocks: list[list[int]]) -> list[int]:
+        '''
+        This method splits the blocks until every block goes to a single block on each symbol.
+
+        Specific: Hopcroft's algorithm, each split only queues the smaller half, so it runs in O(n·|Σ|·log n).
+        @Reference: Hopcroft, J. An n log n algorithm for minimizing states in a finite automaton. Theory of Machines and Computations (1971).
+        Parameters:
+        - delta: delta[a][i] is the state reached from the state i using the symbol a, every state must have it.
+        - blocks: The initial partition of the states 0..n-1.
+        Returns:
+        - The block number of every state.
+        '''
+        inverse = []
+        for row in delta:
+            predecessors = defaultdict(list)
+            for i, j in enumerate(row):
+                predecessors[j].append(i)
+            inverse.append(predecessors)
+
+        blocks = [set(block) for block in blocks if block]
+        blockOf = [0] * sum(len(block) for block in blocks)
+        for k, block in enumerate(blocks):
+            for i in block:
+                blockOf[i] = k
+
+        pending = [(k, a) for k in range(len(blocks))
+                   for a in range(len(delta))]
+        queued = set(pending)
+        while pending:
+            splitter = pending.pop()
+            queued.discard(splitter)
+            k, a = splitter
+
+            touched = defaultdict(list)
+            for j in blocks[k]:
+                for i in inverse[a].get(j, ()):
+                    touched[blockOf[i]].append(i)
+
+            for y, members in touched.items():
+                if len(members) == len(blocks[y]):
+                    continue
+                z = len(blocks)
+                blocks.append(set(members))
+                blocks[y].difference_update(members)
+                for i in members:
+                    blockOf[i] = z
+                for c in range(len(delta)):
+                    if (y, c) in queued or len(blocks[z]) <= len(blocks[y]):
+                        added = (z, c)
+                    else:
+                        added = (y, c)
+                    if added not in queued:
+                        queued.add(added)
+                        pending.append(added)
+
+        return blockOf
+
+    def isMarker(self, symbol) -> bool:
+        '''
+        This function returns True if the symbol is a '#TOKEN' acceptance marker.
+        '''
+        return isinstance(symbol, str) and symbol.startswith(HASHTAG)
+
     def draw(self, name: str, id: int, label: str = None):
         '''
         This method is made for draw the automaton.
         '''
+        # Only drawing needs graphviz
+        from graphviz import Digraph
+
         dot = Digraph(
             graph_attr={
                 'rankdir': 'LR',
@@ -74,20 +260,33 @@ class Automaton(object):
 
         dot.render(f'{id}/{name}', format='png', cleanup=True)
 
-    def simulate(self, input: list):
+    def simulate(self, input: list, start: int = 0):
         '''
-        This method is made for simulate the automaton.
+        This method is made for simulate the automaton over a prefix of input[start:].
+
+        Specific: The simulation stops at the first missing transition or dead row, remembering the last accepting row it passed.
+        Returns:
+        - (True, end of the longest accepted prefix) when a prefix is accepted, else (False, position where it got stuck).
         '''
         start_time = time.perf_counter()
-        statePointer = self.initialState.id
-        for idx, c in enumerate(input):
-            found = False
-            for transition in self.transitions:
-                if transition.tail_id == statePointer and transition.using == c:
-                    statePointer = transition.head_id
-                    found = True
-                    break
-            if not found:
-                return False, idx
+        table, width = self.table, self.width
+        byteColumns, columnOfCode = self.byteColumns, self.columnOfCode
+        acceptRows, deadRows = self.acceptRows, self.deadRows
+        row = self.startRow
+        lastEnd = start if acceptRows[row] == 1 else None
+        position = start
+        while position < len(input):
+            c = input[position]
+            column = byteColumns[c] if c < 256 else columnOfCode(c)
+            if column < 0:
+                break
+            row = table[row * width + column]
+            if row < 0 or deadRows[row]:
+                break
+            position += 1
+            if acceptRows[row] == 1:
+                lastEnd = position
         self.simulationTime = time.perf_counter() - start_time
-        return statePointer in [state.id for state in self.acceptanceStates], len(input)
+        if lastEnd is None:
+            return False, position
+        return True, lastEnd
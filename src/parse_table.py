@@ -0,0 +1,184 @@
+"""
+@File name: parse_table.py
+@Module: Parse Table
+@Description: This file contains the SLR(1) and LALR(1) ACTION and GOTO tables of a grammar, packed with row displacement.
+"""
+
+from array import array
+
+from src.grammar import Grammar, END_MARKER
+
+ERROR = 0
+ACCEPT = -1
+
+
+class ParseTable(object):
+    """
+    This class represents the SLR(1) or LALR(1) ACTION and GOTO tables of a grammar.
+    An action is an int: ERROR, s + 1 to shift to the state s, -(p + 1) to reduce by the production p,
+    and ACCEPT, which is reducing by the augmented start production. A GOTO entry is the state + 1.
+    The terminals are the first columns and the non-terminals the following ones, the entry (state, column)
+    is values[base[state] + column] when check at that index is the state.
+    """
+
+    def __init__(self, grammar: Grammar, symbols, lalr: bool = False) -> None:
+        """
+        Building the tables of an augmented grammar, from its LR(0) items and FOLLOW sets or LALR(1) lookaheads.
+        Parameters:
+        - grammar: The augmented grammar, grammar.items(symbols) and compute_follow() or compute_lookaheads() are run when missing.
+        - symbols: The grammar symbols, terminals and non-terminals.
+        - lalr: Reduce on the LALR(1) lookaheads instead of the FOLLOW sets, with the same LR(0) states.
+        """
+        if not hasattr(grammar, 'item_sets'):
+            grammar.items(symbols)
+        if lalr and not hasattr(grammar, 'lookaheads'):
+            grammar.compute_lookaheads()
+        elif not lalr and not hasattr(grammar, 'follow_sets'):
+            grammar.compute_follow()
+
+        self.method = 'LALR(1)' if lalr else 'SLR(1)'
+
+        self.productions = list(grammar.productions)
+        self.start_symbol = grammar.start_symbol
+        self.check_augmented()
+        self.terminals = [symbol for symbol in symbols if symbol not in grammar.nonterminals] + [END_MARKER]
+        self.nonterminals = [symbol for symbol in symbols if symbol in grammar.nonterminals]
+        self.column_of = {symbol: column for column, symbol in enumerate(self.terminals + self.nonterminals)}
+        self.state_count = len(grammar.item_sets)
+        # (state, symbol, kept action, discarded action) of every conflict
+        self.conflicts = []
+
+        self.base = array('i')
+        self.values = array('i')
+        self.check = array('i')
+
+        self.build(grammar, lalr)
+
+    def check_augmented(self) -> None:
+        """
+        ACCEPT is also the reduce action of the production 0, so it must be the only production of the start symbol
+        and the start symbol must not be used in any body, which is what Grammar.augment() builds.
+        """
+        start_productions = [idx for idx, (head, _) in enumerate(self.productions) if head == self.start_symbol]
+        if start_productions != [0] or any(self.start_symbol in body for _, body in self.productions):
+            raise ValueError(f'{self.start_symbol} is not the augmented start symbol, run Grammar.augment() first')
+
+    def build(self, grammar: Grammar, lalr: bool) -> None:
+        """
+        Filling the rows of the tables, SLR(1) reduces A -> α • on FOLLOW(A) and LALR(1) on the lookaheads of the item in the state.
+        A shift/reduce conflict keeps the shift and a reduce/reduce conflict the earlier production, like yacc does.
+        """
+        rows = []
+        for state, (closure_set, gotos) in enumerate(zip(grammar.item_sets, grammar.gotos)):
+            row = {}
+            for symbol, target in gotos.items():
+                if symbol in self.column_of:
+                    row[self.column_of[symbol]] = target + 1
+
+            for item in sorted(closure_set):
+                if grammar.item_next[item] is not None:
+                    continue
+                production = grammar.item_production[item]
+                head = self.productions[production][0]
+                if head == self.start_symbol:
+                    self.set_action(row, state, END_MARKER, ACCEPT)
+                    continue
+                lookahead = grammar.lookaheads.get((state, production), ()) if lalr else grammar.follow_sets[head]
+                for terminal in lookahead:
+                    self.set_action(row, state, terminal, -(production + 1))
+            rows.append(row)
+
+        self.pack(rows)
+
+    def set_action(self, row: dict, state: int, terminal: str, action: int) -> None:
+        column = self.column_of.get(terminal)
+        if column is None:
+            return
+        existing = row.get(column, ERROR)
+        if existing == ERROR or existing == action:
+            row[column] = action
+            return
+
+        # The shifts are positive, and a smaller production is a greater reduce action
+        kept, discarded = (existing, action) if existing > action else (action, existing)
+        row[column] = kept
+        self.conflicts.append((state, terminal, kept, discarded))
+
+    def pack(self, rows: list[dict]) -> None:
+        """
+        Row displacement: every row is placed at the first base where its entries fall on free cells,
+        the rows with more entries first because they are the hardest to place.
+        Only a window of bases after the first free cell is tried, the row goes after the last used cell otherwise.
+        """
+        self.base = array('i', [0]) * len(rows)
+        self.values = array('i')
+        self.check = array('i')
+        check = self.check
+        window = len(self.column_of)
+
+        first_free = 0
+        for state in sorted(range(len(rows)), key=lambda state: -len(rows[state])):
+            row = rows[state]
+            if not row:
+                continue
+            columns = sorted(row)
+            offset = max(first_free - columns[0], 0)
+            # From last on every cell of the row is past the used ones
+            last = max(len(check) - columns[0], offset)
+            limit = min(last, offset + window)
+            while offset < limit and any(offset + column < len(check) and check[offset + column] != -1 for column in columns):
+                offset += 1
+            if offset == limit:
+                offset = last
+
+            end = offset + columns[-1] + 1
+            if end > len(check):
+                self.values.extend([ERROR] * (end - len(self.values)))
+                check.extend([-1] * (end - len(check)))
+            for column in columns:
+                self.values[offset + column] = row[column]
+                check[offset + column] = state
+            self.base[state] = offset
+
+            while first_free < len(check) and check[first_free] != -1:
+                first_free += 1
+
+    def entry(self, state: int, column: int) -> int:
+        idx = self.base[state] + column
+        if idx < len(self.check) and self.check[idx] == state:
+            return self.values[idx]
+        return ERROR
+
+    def action(self, state: int, terminal: str) -> int:
+        column = self.column_of.get(terminal)
+        return ERROR if column is None else self.entry(state, column)
+
+    def goto(self, state: int, nonterminal: str) -> int:
+        """
+        The state after reducing to the non-terminal, -1 when there is none
+        """
+        return self.entry(state, self.column_of[nonterminal]) - 1
+
+    def action_to_str(self, action: int) -> str:
+        if action == ACCEPT:
+            return 'acc'
+        if action > 0:
+            return f's{action - 1}'
+        if action < 0:
+            return f'r{-action - 1}'
+        return ''
+
+    def conflict_to_str(self, conflict) -> str:
+        state, terminal, kept, discarded = conflict
+        kind = 'shift/reduce' if kept > 0 or discarded > 0 else 'reduce/reduce'
+        return f'I{state} on {terminal}: {kind}, kept {self.action_to_str(kept)} over {self.action_to_str(discarded)}'
+
+    def row_to_str(self, state: int) -> str:
+        actions = ', '.join(f'{terminal} {self.action_to_str(self.action(state, terminal))}'
+                            for terminal in self.terminals if self.action(state, terminal) != ERROR)
+        gotos = ', '.join(f'{nonterminal} {self.goto(state, nonterminal)}'
+                          for nonterminal in self.nonterminals if self.goto(state, nonterminal) >= 0)
+        return f'{actions} | {gotos}' if gotos else actions
+
+    def __str__(self) -> str:
+        return '\n'.join(f'\tI{state}: {self.row_to_str(state)}' for state in range(self.state_count))
@@ -6,6 +6,8 @@
 @Description: Contains the constants used in the implementation of the compiler.
 """
 
+from src.utils.structures.char_class import CharClass
+
 EPSILON = 'ϵ'
 LPAREN = '('
 RPAREN = ')'
@@ -37,4 +39,7 @@ SPECIAL = 'SPECIAL'
 SPECIAL2 = 'SPECIAL2'
 EXTRACT_REMINDER = 'EXTRACT_REMINDER'
 
-UNIVERSE = set(str(i) for i in range(256))
+UNIVERSE = CharClass([(0, 255)])
+
+# Code of a space outside quotes, beyond the unicode range so it never matches a quoted ' '
+UNQUOTED_WS = 0x110000
@@ -8,6 +8,7 @@ from src.utils.constants import LPAREN, RPAREN, OR, KLEENE_STAR, ONE_OR_MORE
 class Pattern(object):
     '''
     This class represents the pattern module.
+    The automaton is compiled on first use, so importing the patterns is cheap.
     '''
 
     def __init__(self,
@@ -23,7 +24,19 @@ class Pattern(object):
         self.nested = nested
         self.leftMatch = leftMatch
         self.rightMatch = rightMatch
-        self.build(0)
+        self.expr: Expression = None
+        self.ast: AST = None
+        self.dir_dfa: DirDFA = None
+        self._min_dir_dfa: MinDFA = None
+
+    @property
+    def min_dir_dfa(self) -> MinDFA:
+        '''
+        The minimized DFA of the pattern, built the first time it is needed.
+        '''
+        if self._min_dir_dfa is None:
+            self.build(0)
+        return self._min_dir_dfa
 
     def build(self, idx: int) -> None:
         '''
@@ -50,12 +63,13 @@ class Pattern(object):
 
         self.dir_dfa = DirDFA(self.ast.root.deepCopy())
 
-        self.min_dir_dfa = MinDFA(self.dir_dfa, self.ast.alphabet)
-        self.min_dir_dfa.nested = self.nested
-        self.min_dir_dfa.leftMatch = self.leftMatch
-        self.min_dir_dfa.rightMatch = self.rightMatch
+        self._min_dir_dfa = MinDFA(self.dir_dfa, self.dir_dfa.alphabet)
+        if self.nested:
+            self._min_dir_dfa.nest(self.leftMatch, self.rightMatch)
 
     def draw(self, idx: int) -> None:
+        if self.ast is None:
+            self.build(idx)
         self.ast.draw(f'{self.name}_AST', idx, f'{self.name} AST')
         self.dir_dfa.draw(f'{self.name}_DIR_DFA', idx, f'{self.name} DIR DFA')
 
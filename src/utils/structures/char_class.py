@@ -0,0 +1,54 @@
+from bisect import bisect_right
+
+
+class CharClass(tuple):
+    '''
+    Set of character codes kept as sorted, disjoint and non adjacent (lo, hi) ranges.
+    '''
+
+    def __new__(cls, ranges=()):
+        merged = []
+        for lo, hi in sorted(ranges):
+            if merged and lo <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], hi)
+            else:
+                merged.append([lo, hi])
+        return super().__new__(cls, (tuple(r) for r in merged))
+
+    @classmethod
+    def fromCodes(cls, codes):
+        '''
+        Builds the class of the given codes.
+        '''
+        return cls((code, code) for code in codes)
+
+    def __contains__(self, code) -> bool:
+        idx = bisect_right(self, (code, float('inf'))) - 1
+        return idx >= 0 and self[idx][0] <= code <= self[idx][1]
+
+    def difference(self, other: 'CharClass') -> 'CharClass':
+        '''
+        Returns the codes of this class that are not in other.
+        '''
+        result = []
+        for lo, hi in self:
+            for other_lo, other_hi in other:
+                if other_hi < lo or other_lo > hi:
+                    continue
+                if other_lo > lo:
+                    result.append((lo, other_lo - 1))
+                lo = other_hi + 1
+                if lo > hi:
+                    break
+            if lo <= hi:
+                result.append((lo, hi))
+        return CharClass(result)
+
+    def size(self) -> int:
+        '''
+        Returns the number of codes in the class.
+        '''
+        return sum(hi - lo + 1 for lo, hi in self)
+
+    def __str__(self) -> str:
+        return '[' + ' '.join(str(lo) if lo == hi else f'{lo}-{hi}' for lo, hi in self) + ']'
@@ -14,29 +14,37 @@ class TreeNode(object):
     def postOrderTraversal(self, function: callable = None):
         '''
         Post order traversal of the binary tree for applying a function to each node
+        It walks an explicit stack, so deep trees do not reach the recursion limit.
         Parameters:
         - function: A function to be applied to each node of the binary tree.
         '''
-        if self.left:
-            self.left.postOrderTraversal(function)
-        if self.right:
-            self.right.postOrderTraversal(function)
-        if function:
-            function(self)
+        stack = [(self, False)]
+        while stack:
+            node, visited = stack.pop()
+            if visited:
+                if function:
+                    function(node)
+                continue
+            stack.append((node, True))
+            if node.right:
+                stack.append((node.right, False))
+            if node.left:
+                stack.append((node.left, False))
 
     def deepCopy(self):
         '''
         Deep copy of the binary tree.
+        The copies of the children wait in a stack until their parent is copied.
         '''
-        if self.left:
-            left = self.left.deepCopy()
-        else:
-            left = None
-        if self.right:
-            right = self.right.deepCopy()
-        else:
-            right = None
-        return TreeNode(self.value, right, left)
+        copies = []
+
+        def copyNode(node):
+            right = copies.pop() if node.right else None
+            left = copies.pop() if node.left else None
+            copies.append(TreeNode(node.value, right, left))
+
+        self.postOrderTraversal(copyNode)
+        return copies.pop()
 
     def getPlainRepresentation(self):
         '''
@@ -70,6 +70,38 @@ def readFile(file: str) -> str:
         return f.read()
 
 
+def readChunks(file: str, chunkSize: int = 65536):
+    '''
+    This function reads a file lazily.
+    Parameters:
+    - file: A string representing the file name.
+    - chunkSize: The number of characters read at a time.
+    Returns:
+    - A generator of the content of the file, chunkSize characters at a time.
+    '''
+    with open(file, 'r', encoding='utf-8') as f:
+        while chunk := f.read(chunkSize):
+            yield chunk
+
+
+def iterateBits(mask: int):
+    '''
+    This function yields the positions of the bits set in mask, from the lowest.
+    Wide masks are read from their binary digits, clearing bits one by one would copy the whole int each time.
+    '''
+    if mask.bit_length() <= 256:
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+        return
+    digits = bin(mask)[:1:-1]
+    position = digits.find('1')
+    while position >= 0:
+        yield position
+        position = digits.find('1', position + 1)
+
+
 def numberToLetter(number: int) -> str:
     '''
     This function return a letter from A to Z based on the number.
@@ -0,0 +1,33 @@
+import pickle
+
+import pytest
+
+from src._actions import Actions
+
+
+def test_action_runs_with_the_lexeme_position_and_table():
+    actions = Actions({'ID': "{ symbolTable.append((lexeme, position, '\\t')) }"})
+    table = []
+
+    actions.functions['ID']('x1', 4, table)
+
+    assert table == [('x1', 4, '\t')]
+    assert not actions.errorsManager.haveErrors()
+
+
+def test_pickled_actions_are_loaded_compiled():
+    actions = pickle.loads(pickle.dumps(Actions({'ID': '{ symbolTable.append(lexeme) }', 'WS': '{ }'})))
+    table = []
+
+    actions.functions['ID']('x1', 0, table)
+    actions.functions['WS'](' ', 2, table)
+
+    assert table == ['x1']
+
+
+def test_action_that_does_not_compile_raises_when_matched():
+    actions = Actions({'ID': '{ return ( }'})
+
+    assert actions.errorsManager.haveErrors()
+    with pytest.raises(SyntaxError):
+        actions.functions['ID']('x1', 0, [])
@@ -0,0 +1,53 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+from yalex import yalex
+from src.utils.tools import readFile
+
+
+@pytest.mark.parametrize('yal_path, txt_path', [
+    ('input/tests/slr-1/slr-1.yal', 'input/tests/slr-1/slr-1-1.txt'),
+    ('input/yapal/yapal.yal', 'input/tests/slr-1/slr-1.yalp'),
+])
+def test_standalone_lexer_matches_pickled_analyzer(yal_path, txt_path, tmp_path):
+    """
+    The standalone module runs without the generator package, from a directory where src can not be imported
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        yalex(yal_path, str(tmp_path), False, False, False, False)
+    input_path = tmp_path / 'input.txt'
+    input_path.write_text(readFile(txt_path) + ' #λ? x1', encoding='utf-8')
+
+    def run(script: str, env: dict) -> str:
+        return subprocess.run([sys.executable, str(tmp_path / script), str(input_path), 'false'], cwd=tmp_path,
+                              env=env, capture_output=True, text=True, check=True).stdout
+
+    pickled = run('YALEX_ANALYZER.py', {**os.environ, 'PYTHONPATH': os.getcwd()})
+    standalone = run('YALEX_LEXER.py', {key: value for key, value in os.environ.items() if key != 'PYTHONPATH'})
+
+    assert standalone == pickled
+    assert pickled
+
+
+@pytest.mark.parametrize('script', ['YALEX_ANALYZER.py', 'YALEX_LEXER.py'])
+def test_stream_actions_get_the_symbol_table(script, tmp_path):
+    yal_path = tmp_path / 'seen.yal'
+    yal_path.write_text("let letter = ['a'-'z']\nlet ws = [' ''\\n']+\nlet id = letter+\n\nrule tokens =\n"
+                        "  ws { WS }\n  | id { print('seen', len(symbolTable), symbolTable[-1][1]) }\n", encoding='utf-8')
+    with contextlib.redirect_stdout(io.StringIO()):
+        yalex(str(yal_path), str(tmp_path), False, False, False, False)
+    input_path = tmp_path / 'input.txt'
+    input_path.write_text('ab cd', encoding='utf-8')
+
+    def run(*options: str) -> list[str]:
+        return subprocess.run([sys.executable, str(tmp_path / script), str(input_path), 'false', *options], cwd=tmp_path,
+                              env={**os.environ, 'PYTHONPATH': os.getcwd()}, capture_output=True, text=True, check=True).stdout.splitlines()
+
+    seen = ['seen 1 ab', 'seen 3 cd']
+    assert [line for line in run() if line.startswith('seen')] == seen
+    assert [line for line in run('--stream') if line.startswith('seen')] == seen
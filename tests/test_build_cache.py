@@ -0,0 +1,45 @@
+import contextlib
+import io
+import os
+
+from yalex import yalex
+from src.build_cache import CACHE_DIR_VARIABLE, cache_key, store_cached, load_cached
+
+
+def run_yalex(yal_path: str, dir_name) -> tuple:
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        structure = yalex(yal_path, str(dir_name), False, False, False)
+    return structure, output.getvalue()
+
+
+def test_second_build_is_loaded_from_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_VARIABLE, str(tmp_path / 'cache'))
+
+    built, built_output = run_yalex('input/tests/slr-1/slr-1.yal', tmp_path)
+    cached, cached_output = run_yalex('input/tests/slr-1/slr-1.yal', tmp_path)
+
+    assert 'build cache' not in built_output
+    assert 'build cache' in cached_output
+    assert (built.table, built.acceptTokens) == (cached.table, cached.acceptTokens)
+    assert (tmp_path / 'YALEX_ANALYZER.pkl').exists()
+
+
+def test_least_recently_used_entries_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_VARIABLE, str(tmp_path))
+    keys = [cache_key(str(idx)) for idx in range(4)]
+
+    for idx, key in enumerate(keys):
+        store_cached(key, idx, max_entries=3)
+        os.utime(tmp_path / f'{key}.pkl', (idx, idx))
+
+    assert load_cached(keys[0]) is None
+    assert [load_cached(key) for key in keys[1:]] == [1, 2, 3]
+
+
+def test_broken_entry_is_a_miss(tmp_path, monkeypatch):
+    monkeypatch.setenv(CACHE_DIR_VARIABLE, str(tmp_path))
+    key = cache_key('broken')
+    (tmp_path / f'{key}.pkl').write_bytes(b'\x80')
+
+    assert load_cached(key) is None
@@ -0,0 +1,217 @@
+import contextlib
+import io
+import pickle
+
+import pytest
+
+from yalex import yalex
+from src._expression import Expression
+from src.utils.patterns import Pattern
+from src.utils.structures.char_class import CharClass
+from src.utils.structures.transition import Transition
+from src.utils.tools import readFile, readChunks, numberToLetter, iterateBits
+
+
+def build_dir_dfa(regex: str):
+    pattern = Pattern('TEST', regex)
+    pattern.build(0)
+    return pattern.dir_dfa
+
+
+def build_analyzer(yal_path: str, dir_name):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return yalex(yal_path, str(dir_name), False, False, False, False)
+
+
+def transitions_scan(dfa, input: list):
+    """
+    The scan over the transitions list that specialSimulate did before the compiled table, kept as the reference.
+    """
+    statePointer = dfa.initialState.id
+    for idx, c in enumerate(input):
+        found = False
+        for transition in dfa.transitions:
+            using = transition.using
+            if transition.tail_id == statePointer and (using == c or isinstance(using, CharClass) and c in using):
+                statePointer = transition.head_id
+                found = True
+                break
+        if not found:
+            for transition in dfa.transitions:
+                if transition.tail_id == statePointer and dfa.isMarker(transition.using):
+                    return transition.using[1:], idx
+            return False, idx
+    return False, len(input)
+
+
+def sliced_tokens(simulate, codified: list) -> list:
+    """
+    The driver loop of the analyzers before tokens(), simulating over the rest of the input at every token.
+    A code no class contains is appended after the input like the old drivers did.
+    """
+    codified = list(codified) + [0x110001]
+    tokens = []
+    forward = 0
+    while forward < len(codified) - 1:
+        match, idx = simulate(codified[forward:])
+        if match is False:
+            forward += 1
+        else:
+            tokens.append((match, forward, forward + idx))
+            forward += idx
+    return tokens
+
+
+SPECS = [
+    ('input/tests/slr-1/slr-1.yal', 'input/tests/slr-1/slr-1-1.txt'),
+    ('input/yapal/yapal.yal', 'input/tests/slr-1/slr-1.yalp'),
+]
+
+
+@pytest.mark.parametrize('yal_path, txt_path', SPECS)
+def test_table_matches_transitions_scan(yal_path, txt_path, tmp_path):
+    dfa = build_analyzer(yal_path, tmp_path)
+    codified = Expression().extraSoftCodify(readFile(txt_path) + ' #λ? x1')
+
+    expected = sliced_tokens(lambda input: transitions_scan(dfa, input), codified)
+    assert sliced_tokens(dfa.specialSimulate, codified) == expected
+    assert expected
+
+
+@pytest.mark.parametrize('yal_path, txt_path', SPECS)
+def test_tokens_match_sliced_driver(yal_path, txt_path, tmp_path):
+    dfa = build_analyzer(yal_path, tmp_path)
+    codified = Expression().extraSoftCodify(readFile(txt_path) + ' #λ? x1')
+
+    scanned = [token for token in dfa.tokens(codified) if token[0] is not False]
+    assert scanned == sliced_tokens(dfa.specialSimulate, codified)
+
+
+def test_spec_with_hundreds_of_keywords(tmp_path):
+    """
+    Let names only take letters, so the keywords are numbered with numberToLetter
+    """
+    keywords = [f'{numberToLetter(idx + 27)}kw' for idx in range(300)]
+    lets = [f"let {keyword} = {''.join(repr(c) for c in keyword)}" for keyword in keywords]
+    lets += ["let letter = ['a'-'z']", "let digit = ['0'-'9']", "let id = letter(letter|digit)*",
+             "let ws = [' ''\\t''\\n']+"]
+    rules = [f'{keyword} {{ {keyword.upper()} }}' for keyword in keywords] + ['id { ID }', 'ws { WS }']
+    yal_path = tmp_path / 'keywords.yal'
+    yal_path.write_text('\n'.join(lets) + '\n\nrule tokens =\n  ' + '\n  | '.join(rules) + '\n', encoding='utf-8')
+
+    dfa = build_analyzer(str(yal_path), tmp_path)
+    text = ' '.join(keywords + ['kw', 'aakw1', 'x'])
+
+    tokens = [token for token, _, _ in dfa.tokens(Expression().extraSoftCodify(text)) if token != 'ws']
+    assert tokens == keywords + ['id', 'id', 'id']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 65536])
+def test_stream_matches_whole_text(chunk_size, tmp_path):
+    """
+    Lexemes that cross a chunk boundary are carried over, so any chunk size yields the tokens of the whole text
+    """
+    dfa = build_analyzer('input/tests/slr-1/slr-1.yal', tmp_path)
+    text = readFile('input/tests/slr-1/slr-1-1.txt') * 3 + ' #λ? x1'
+    txt_path = tmp_path / 'input.txt'
+    txt_path.write_text(text, encoding='utf-8')
+
+    whole = [(token, text[start:end] if token else text[start], start)
+             for token, start, end in dfa.tokens(Expression().extraSoftCodify(text))]
+    assert list(dfa.stream(readChunks(str(txt_path), chunk_size))) == whole
+
+
+def test_followpos_bitmasks_of_the_dragon_book_example():
+    """
+    (a|b)*abb#, positions numbered left to right like the book, with the terminator last
+    """
+    dfa = build_dir_dfa('(a|b)*abb')
+    terminator = next(id for id, symbol in dfa.symbols.items() if symbol == 'TERMINATOR')
+    order = sorted(id for id in dfa.symbols if id != terminator) + [terminator]
+    book = {id: idx + 1 for idx, id in enumerate(order)}
+
+    followpos = {book[id]: {book[following] for following in iterateBits(positions)}
+                 for id, positions in dfa.followPosDict.items()}
+    assert followpos == {1: {1, 2, 3}, 2: {1, 2, 3}, 3: {4}, 4: {5}, 5: {6}}
+    assert len(dfa.states) == 4
+
+
+def test_pickle_of_wide_alternation_does_not_grow_with_positions():
+    """
+    A 4000-way alternation has 8000 positions but 3 states, its pickle must not keep the followPos bitmasks
+    """
+    small = pickle.dumps(build_dir_dfa('|'.join(['ab'] * 10)))
+    large = pickle.dumps(build_dir_dfa('|'.join(['ab'] * 4000)))
+
+    assert len(large) == len(small)
+    assert len(large) < 4096
+
+
+def test_pickle_of_long_concatenation_is_linear():
+    """
+    'a' * n has n + 1 states, so its pickle grows linearly and not with the square of the positions
+    """
+    dfa = build_dir_dfa('a' * 3000)
+    data = pickle.dumps(dfa)
+
+    assert len(data) < 3000 * 128
+    loaded = pickle.loads(data)
+    assert loaded.simulate([ord('a')] * 3000) == (True, 3000)
+    assert loaded.simulate([ord('a')] * 2999) == (False, 2999)
+
+
+def test_batch_tokens_match_tokens_of_each_record(tmp_path):
+    pytest.importorskip('numpy')
+    dfa = build_analyzer('input/tests/slr-1/slr-1.yal', tmp_path)
+    records = readFile('input/tests/slr-1/slr-1-1.txt').splitlines() + ['', 'x', ' #λ? x1', '(a+b)*c']
+    codify = Expression().extraSoftCodify
+
+    assert dfa.batchTokens(records) == [list(dfa.tokens(codify(record))) for record in records]
+
+
+@pytest.mark.parametrize('text', ['ab cd\n(x1 + y)', 'λx + ab\n*y'])
+def test_batch_tokens_of_a_packed_buffer_and_its_memoryview(text, tmp_path):
+    pytest.importorskip('numpy')
+    dfa = build_analyzer('input/tests/slr-1/slr-1.yal', tmp_path)
+    records = text.split('\n')
+    buffer = Expression().extraSoftCodify(''.join(records))
+    offsets = [0, len(records[0]), len(buffer)]
+    expected = dfa.batchTokens(records)
+
+    assert dfa.batchTokens(buffer, offsets) == expected
+    assert dfa.batchTokens(memoryview(buffer), offsets) == expected
+
+
+def test_analyzer_pickled_with_str_codes_is_compiled_when_loaded(tmp_path):
+    """
+    Before the int codes the transitions used one str code per character, and the pickle had no table
+    """
+    dfa = build_analyzer('input/tests/slr-1/slr-1.yal', tmp_path)
+    codified = Expression().extraSoftCodify(readFile('input/tests/slr-1/slr-1-1.txt') + ' #λ? x1')
+    expected = list(dfa.tokens(codified))
+
+    state = pickle.loads(pickle.dumps(dfa)).__dict__
+    transitions = []
+    for transition in state['transitions']:
+        if isinstance(transition.using, CharClass):
+            transitions += [Transition(transition.tail_id, transition.head_id, str(code))
+                            for lo, hi in transition.using for code in range(lo, hi + 1)]
+        else:
+            transitions.append(transition)
+    state['transitions'] = transitions
+    for name in ('table', 'columnOf', 'byteColumns', 'rowOf', 'acceptTokens', 'deadRows'):
+        del state[name]
+    legacy = object.__new__(type(dfa))
+    legacy.__setstate__(state)
+
+    assert list(legacy.tokens(codified)) == expected
+
+
+def test_analyzer_pickled_without_actions_asks_to_regenerate(tmp_path):
+    dfa = build_analyzer('input/tests/slr-1/slr-1.yal', tmp_path)
+    state = pickle.loads(pickle.dumps(dfa)).__dict__
+    del state['actions']
+    legacy = object.__new__(type(dfa))
+
+    with pytest.raises(pickle.UnpicklingError, match='regenerate'):
+        legacy.__setstate__(state)
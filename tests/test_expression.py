@@ -0,0 +1,19 @@
+import pytest
+
+from src._expression import Expression
+
+
+@pytest.mark.parametrize('text, packed', [
+    ('samuel 21881', bytes),
+    ('año', bytes),
+    ('λx', 'H'),
+    ('𝜆x', 'I'),
+])
+def test_soft_codify_packs_the_code_points(text, packed):
+    codified = Expression().extraSoftCodify(text)
+
+    if packed is bytes:
+        assert isinstance(codified, bytes)
+    else:
+        assert codified.typecode == packed
+    assert list(codified) == [ord(c) for c in text]
@@ -0,0 +1,154 @@
+import pytest
+
+from src.grammar import Grammar, END_MARKER
+from src.parse_table import ParseTable, ERROR, ACCEPT
+
+
+def build_grammar(productions):
+    grammar = Grammar(list(productions))
+    grammar.augment()
+    return grammar
+
+
+def test_first_stops_at_non_nullable_nonterminal():
+    """
+    S -> X A, X -> x, A -> A c | d: 'c' follows A, it is neither in FIRST(A) nor in FOLLOW(X)
+    """
+    grammar = build_grammar([('S', ('X', 'A')), ('X', ('x',)), ('A', ('A', 'c')), ('A', ('d',))])
+    grammar.compute_first()
+    grammar.compute_follow()
+
+    assert grammar.first_sets['A'] == {'d'}
+    assert grammar.first_sets['S'] == {'x'}
+    assert grammar.follow_sets['X'] == {'d'}
+    assert grammar.follow_sets['A'] == {'c', END_MARKER}
+
+
+def test_slr_table_does_not_reduce_on_wrong_follow():
+    grammar = build_grammar([('S', ('X', 'A')), ('X', ('x',)), ('A', ('A', 'c')), ('A', ('d',))])
+    table = ParseTable(grammar, ['x', 'c', 'd', 'S', 'X', 'A'])
+
+    after_x = table.action(0, 'x') - 1
+    assert table.action(after_x, 'c') == ERROR
+    assert table.action(after_x, 'd') == -(2 + 1)
+    assert not table.conflicts
+
+
+def test_first_through_nullable_prefix():
+    grammar = build_grammar([('S', ('N', 'a')), ('N', ()), ('N', ('b',))])
+    grammar.compute_first()
+
+    assert grammar.first_sets['N'] == {'b', 'ε'}
+    assert grammar.first_sets['S'] == {'a', 'b'}
+
+
+def test_expression_grammar_table():
+    grammar = build_grammar([
+        ('E', ('E', 'PLUS', 'T')), ('E', ('T',)),
+        ('T', ('T', 'TIMES', 'F')), ('T', ('F',)),
+        ('F', ('LPAREN', 'E', 'RPAREN')), ('F', ('ID',)),
+    ])
+    table = ParseTable(grammar, ['PLUS', 'TIMES', 'LPAREN', 'RPAREN', 'ID', 'E', 'T', 'F'])
+
+    assert grammar.first_sets['E'] == {'LPAREN', 'ID'}
+    assert grammar.follow_sets['T'] == {'PLUS', 'TIMES', 'RPAREN', END_MARKER}
+    assert table.state_count == 12
+    assert not table.conflicts
+
+
+def test_accept_is_only_the_augmented_start_production():
+    grammar = build_grammar([('S', ('S', 'a')), ('S', ('a',))])
+    table = ParseTable(grammar, ['a', 'S'])
+
+    after_s = table.goto(0, 'S')
+    assert table.action(after_s, END_MARKER) == ACCEPT
+    assert all(table.action(state, terminal) != ACCEPT
+               for state in range(table.state_count) for terminal in table.terminals if state != after_s)
+
+
+def test_table_of_grammar_not_augmented_is_refused():
+    """
+    Without augment() the production 0 is S -> S a, whose reduce would be read as ACCEPT
+    """
+    grammar = Grammar([('S', ('S', 'a')), ('S', ('a',))])
+
+    with pytest.raises(ValueError):
+        ParseTable(grammar, ['a', 'S'])
+
+
+def legacy_closure(grammar, items):
+    """
+    The closure before the productions index, every round scans every item against every production.
+    """
+    items = [(item[0], item[1], item[2]) for item in items]
+    closure_set = set(items)
+    kernel_items = set(items)
+    while True:
+        new_items = set()
+        for (head, body, dot_position) in closure_set:
+            if dot_position < len(body) and body[dot_position] in grammar.nonterminals:
+                B = body[dot_position]
+                for production in grammar.productions:
+                    if production[0] == B and (B, production[1], 0) not in closure_set:
+                        new_items.add((B, production[1], 0))
+                if dot_position > 0:
+                    kernel_items.add((head, body, dot_position))
+        if not new_items:
+            break
+        closure_set.update(new_items)
+    return {(head, body, dot_position, False) for head, body, dot_position in closure_set - kernel_items if body != ()} | \
+        {(head, body, dot_position, True) for head, body, dot_position in kernel_items}
+
+
+def legacy_items(grammar, symbols):
+    """
+    The items before the kernel keyed states, every round computes the GOTO of every set on every symbol.
+    """
+    def goto(items, symbol):
+        goto_items = set()
+        for head, body, dot_position, _ in items:
+            if dot_position < len(body) and body[dot_position] == symbol:
+                goto_items |= legacy_closure(grammar, {(head, body, dot_position + 1, True)})
+        return goto_items
+
+    C = [legacy_closure(grammar, {(grammar.start_symbol, grammar.productions[0][1], 0, True)})]
+    set_indices = {frozenset(C[0]): 0}
+    while True:
+        new_sets_added = False
+        for I in C:
+            for X in symbols:
+                goto_set = frozenset(goto(I, X))
+                if goto_set and goto_set not in set_indices:
+                    C.append(set(goto_set))
+                    set_indices[goto_set] = len(C) - 1
+                    new_sets_added = True
+        if not new_sets_added:
+            return C
+
+
+def operators_grammar(levels: int):
+    """
+    Binary operators with the given number of precedence levels
+    """
+    productions = []
+    for level in range(levels):
+        productions.append((f'e{level}', (f'e{level}', f'OP{level}', f'e{level + 1}')))
+        productions.append((f'e{level}', (f'e{level + 1}',)))
+    productions.append((f'e{levels}', ('LPAREN', 'e0', 'RPAREN')))
+    productions.append((f'e{levels}', ('ID',)))
+    symbols = [f'e{level}' for level in range(levels + 1)] + \
+        [f'OP{level}' for level in range(levels)] + ['LPAREN', 'RPAREN', 'ID']
+    return productions, symbols
+
+
+@pytest.mark.parametrize('productions, symbols', [
+    operators_grammar(1),
+    operators_grammar(6),
+    ([('S', ('N', 'a')), ('N', ()), ('N', ('b',))], ['S', 'N', 'a', 'b']),
+    ([('S', ('X', 'A')), ('X', ('x',)), ('A', ('A', 'c')), ('A', ('d',))], ['x', 'c', 'd', 'S', 'X', 'A']),
+])
+def test_items_match_the_rescanning_closure(productions, symbols):
+    grammar = build_grammar(productions)
+    states, _ = grammar.items(symbols)
+
+    assert states == legacy_items(grammar, symbols)
@@ -0,0 +1,66 @@
+import pytest
+
+from src.grammar import Grammar
+from src.parse_table import ParseTable
+from src.lr_parser import LRParser
+
+
+@pytest.fixture
+def parser():
+    grammar = Grammar([
+        ('E', ('E', 'PLUS', 'T')), ('E', ('T',)),
+        ('T', ('T', 'TIMES', 'F')), ('T', ('F',)),
+        ('F', ('LPAREN', 'E', 'RPAREN')), ('F', ('ID',)),
+    ])
+    grammar.augment()
+    table = ParseTable(grammar, ['PLUS', 'TIMES', 'LPAREN', 'RPAREN', 'ID', 'E', 'T', 'F'])
+    return LRParser(table, ['ws'])
+
+
+def test_parses_the_stream_of_the_lexer(parser):
+    tokens = [('id', 'x', 0), ('ws', ' ', 1), ('PLUS', '+', 2), ('ws', ' ', 3), ('id', 'y', 4)]
+
+    tree = parser.parse(iter(tokens))
+
+    assert tree == ('E', [('E', [('T', [('F', ['x'])])]), '+', ('T', [('F', ['y'])])])
+    assert not parser.errorsManager.haveErrors()
+
+
+def test_unexpected_token_reports_terminal_lexeme_and_offset(parser):
+    tokens = [('id', 'x', 0), ('ws', ' ', 1), ('id', 'y', 2)]
+
+    assert parser.parse(tokens) is None
+    error = parser.errorsManager.errors[0].error
+    assert error.startswith("Unexpected ID 'y' at offset 2 in I")
+    assert "'PLUS'" in error
+
+
+def test_unexpected_end_of_input(parser):
+    assert parser.parse([('id', 'x'), ('PLUS', '+')]) is None
+    assert parser.errorsManager.errors[0].error.startswith('Unexpected end of input ($) in I')
+
+
+def test_tokens_without_offset_report_their_index(parser):
+    assert parser.parse([('id', 'x'), ('RPAREN', ')')]) is None
+    assert parser.errorsManager.errors[0].error.startswith("Unexpected RPAREN ')' at token 1 in I")
+
+
+def test_unknown_token_and_unmatched_character(parser):
+    assert parser.parse([('id', 'x', 0), ('minus', '-', 1)]) is None
+    assert parser.errorsManager.errors[0].error == "Unknown terminal MINUS '-' at offset 1, from the token 'minus'"
+
+    assert parser.parse([('id', 'x', 0), (False, '#', 1)]) is None
+    assert parser.errorsManager.errors[1].error == "No token matches '#' at offset 1"
+
+
+def test_lowercase_and_mixed_case_terminals_are_matched_exactly():
+    grammar = Grammar([('list', ('list', 'comma', 'Item')), ('list', ('Item',))])
+    grammar.augment()
+    table = ParseTable(grammar, ['comma', 'Item', 'list'])
+    parser = LRParser(table, ['blank'])
+
+    tokens = [('Item', 'a', 0), ('comma', ',', 1), ('blank', ' ', 2), ('Item', 'b', 3)]
+
+    assert parser.parse(tokens) == ('list', [('list', ['a']), ',', 'b'])
+    assert parser.parse([('Item', 'a', 0), ('item', 'b', 1)]) is None
+    assert parser.errorsManager.errors[0].error == "Unknown terminal ITEM 'b' at offset 1, from the token 'item'"
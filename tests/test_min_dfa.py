@@ -0,0 +1,217 @@
+import random
+from collections import deque
+
+import pytest
+
+import src.utils.patterns as patterns
+from src._expression import Expression
+from src.utils.patterns import Pattern, RETURN
+
+
+def legacy_minimize(dfa, alphabet):
+    """
+    The partition refinement MinDFA.build used before Hopcroft's algorithm, kept as the reference.
+    Returns the initial group, the accepting groups, the transitions between groups by (group, symbol) and the number of groups.
+    """
+    step = {}
+    for transition in dfa.transitions:
+        step.setdefault((transition.tail_id, transition.using), transition.head_id)
+
+    def partition(II):
+        IInew = []
+        for G in II:
+            subgroups = {}
+            for id in G:
+                key = []
+                for a in alphabet:
+                    next_state = step.get((id, a))
+                    for i, group in enumerate(II):
+                        if next_state in group:
+                            if i != id:
+                                key.append(i)
+                                break
+                subgroups.setdefault(tuple(key), []).append(id)
+            IInew.extend(subgroups.values())
+        return IInew
+
+    F = [state.id for state in dfa.acceptanceStates]
+    S_F = [state.id for state in dfa.states if state.id not in F]
+    II = [F, S_F]
+    IInew = partition(II)
+    while IInew != II:
+        II = IInew
+        IInew = partition(II)
+    II = [group for group in II if group]
+
+    group_of = {id: i for i, group in enumerate(II) for id in group}
+    transitions = {}
+    for i, group in enumerate(II):
+        for a in alphabet:
+            next_state = step.get((group[0], a))
+            if next_state is not None:
+                transitions[(i, a)] = group_of[next_state]
+    accepting = {group_of[id] for id in F}
+    return group_of[dfa.initialState.id], accepting, transitions, len(II)
+
+
+def tables(automaton):
+    """
+    Returns the initial state, the accepting states and the transitions by (state, symbol) of an automaton.
+    """
+    transitions = {(transition.tail_id, transition.using): transition.head_id for transition in automaton.transitions}
+    accepting = {state.id for state in automaton.acceptanceStates}
+    return automaton.initialState.id, accepting, transitions
+
+
+def same_language(left, right, alphabet) -> bool:
+    """
+    Walks the product of both automata, a missing transition goes to a dead state that accepts nothing.
+    """
+    left_initial, left_accepting, left_transitions = left[:3]
+    right_initial, right_accepting, right_transitions = right[:3]
+
+    start = (left_initial, right_initial)
+    seen = {start}
+    pending = deque([start])
+    while pending:
+        left_state, right_state = pending.popleft()
+        if (left_state in left_accepting) != (right_state in right_accepting):
+            return False
+        for a in alphabet:
+            following = (left_transitions.get((left_state, a)), right_transitions.get((right_state, a)))
+            if following != (None, None) and following not in seen:
+                seen.add(following)
+                pending.append(following)
+    return True
+
+
+def build(regex: str) -> Pattern:
+    pattern = Pattern('TEST', regex)
+    pattern.build(0)
+    return pattern
+
+
+FIXED_PATTERNS = [pattern.pattern for pattern in vars(patterns).values() if isinstance(pattern, Pattern)] + [
+    "(a|b)*abb",
+    "ab|ac|b+",
+    "(a|b)*a(a|b)(a|b)",
+    "['0'-'9']+(.['0'-'9']+)?",
+    "if|in|int|['a'-'z']+",
+]
+
+
+@pytest.mark.parametrize('regex', FIXED_PATTERNS)
+def test_same_states_and_language_as_partition_refinement(regex):
+    pattern = build(regex)
+    dfa, min_dfa = pattern.dir_dfa, pattern.min_dir_dfa
+    legacy = legacy_minimize(dfa, dfa.alphabet)
+
+    assert len(min_dfa.states) == legacy[3]
+    assert same_language(legacy, tables(min_dfa), dfa.alphabet)
+    assert same_language(tables(dfa), tables(min_dfa), dfa.alphabet)
+
+
+def test_merges_states_partition_refinement_missed():
+    """
+    The old refinement compared group indexes to state ids and kept x(ab)*|y(ab)*|z(ab)* at 7 states
+    """
+    pattern = build("x(ab)*|y(ab)*|z(ab)*")
+    dfa, min_dfa = pattern.dir_dfa, pattern.min_dir_dfa
+    legacy = legacy_minimize(dfa, dfa.alphabet)
+
+    assert len(min_dfa.states) == 3
+    assert legacy[3] == 7
+    assert same_language(legacy, tables(min_dfa), dfa.alphabet)
+
+
+def random_regex(rng: random.Random, depth: int = 0) -> str:
+    r = rng.random()
+    if depth > 3 or r < 0.3:
+        return rng.choice('abc')
+    if r < 0.5:
+        return random_regex(rng, depth + 1) + random_regex(rng, depth + 1)
+    if r < 0.7:
+        return f'({random_regex(rng, depth + 1)}|{random_regex(rng, depth + 1)})'
+    if r < 0.85:
+        return f'({random_regex(rng, depth + 1)})*'
+    return f'({random_regex(rng, depth + 1)})+'
+
+
+def test_random_regexes_keep_language_and_never_grow():
+    """
+    The old refinement also merged states it should not have on some of these, only its correct results are compared by size
+    """
+    rng = random.Random(7)
+    for _ in range(200):
+        regex = random_regex(rng)
+        pattern = build(regex)
+        dfa, min_dfa = pattern.dir_dfa, pattern.min_dir_dfa
+        legacy = legacy_minimize(dfa, dfa.alphabet)
+
+        assert same_language(tables(dfa), tables(min_dfa), dfa.alphabet), regex
+        if same_language(tables(dfa), legacy, dfa.alphabet):
+            assert len(min_dfa.states) <= legacy[3], regex
+
+
+def stack_nested_simulation(dfa, input: list):
+    """
+    The nested simulation before the delimiter rows, a stack of delimiters and a column lookup per character.
+    """
+    rightMatch = ord(dfa.rightMatch)
+    leftMatch = ord(dfa.leftMatch)
+
+    def step(row, c):
+        column = dfa.columnOfCode(c)
+        return dfa.table[row * dfa.width + column] if column >= 0 else -1
+
+    row = dfa.startRow
+    stack = []
+    for idx, c in enumerate(input):
+        if c == leftMatch:
+            stack.append(c)
+            following = step(row, c)
+            if following >= 0:
+                row = following
+        elif c == rightMatch:
+            if not stack or stack[-1] != leftMatch:
+                return False, idx
+            stack.pop()
+            if not stack:
+                following = step(row, c)
+                if following >= 0:
+                    row = following
+        else:
+            row = step(row, c)
+            if row < 0:
+                return False, idx
+    return (dfa.acceptRows[row] == 1 and not stack), len(input)
+
+
+BLOCK = '{ ' + 'if (x) { return { WS } } else { y = 1 }\n' * 50 + '}'
+
+
+@pytest.mark.parametrize('text', [
+    '{ WS }',
+    '{ if (x) { return { WS } } else { y = 1 } }',
+    BLOCK + ' rest',
+    '{ { } rest',
+    '{ } } rest',
+    '} { }',
+    'WS',
+    '{ λ }',
+], ids=range(8))
+def test_delimiter_rows_end_where_stack_simulation_does(text):
+    """
+    The stack simulation only accepted when the whole input was a block, so only the ends are compared
+    """
+    dfa = RETURN.min_dir_dfa
+    codified = list(Expression().extraSoftCodify(text))
+
+    assert dfa.simulate(codified)[1] == stack_nested_simulation(dfa, codified)[1]
+
+
+def test_block_followed_by_text_is_accepted():
+    codified = list(Expression().extraSoftCodify(BLOCK + ' rest'))
+
+    assert RETURN.min_dir_dfa.simulate(codified) == (True, len(BLOCK))
+    assert RETURN.min_dir_dfa.simulate(codified[:-6]) == (False, len(BLOCK) - 1)
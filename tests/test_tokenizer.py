@@ -0,0 +1,35 @@
+import pytest
+
+from src._tokenizer import Tokenizer
+from src.utils.patterns import COMMENT, WS, ID, EQ, EXPR, RETURN
+from src.utils.tools import readFile
+
+
+def per_pattern_tokens(lexer: Tokenizer) -> list:
+    """
+    The meta lexer loop before the union automaton, every pattern simulated over the rest of the input at each token.
+    """
+    tokens = []
+    forward = 0
+    while forward < len(lexer.codified):
+        match = None
+        for pattern in lexer.patterns.values():
+            _, idx = pattern.min_dir_dfa.simulate(lexer.codified[forward:])
+            if idx > 0 and (match is None or idx > match[1]):
+                match = (pattern.name, idx)
+        if match is None:
+            break
+        tokens.append((match[0], forward, forward + match[1]))
+        forward += match[1]
+    return tokens
+
+
+@pytest.mark.parametrize('yal_path', ['input/tests/slr-1/slr-1.yal', 'input/yapal/yapal.yal'])
+def test_union_automaton_matches_each_pattern_on_its_own(yal_path):
+    lexer = Tokenizer(readFile(yal_path))
+    lexer.addPatterns([COMMENT, WS, ID, EQ, EXPR, RETURN])
+    lexer.tokenize()
+
+    union = [(symbol.type, symbol.position, symbol.position + len(symbol.content)) for symbol in lexer.symbolsTable]
+    assert union == per_pattern_tokens(lexer)
+    assert not lexer.errorsManager.haveErrors()
@@ -10,14 +10,41 @@ from src._expression import Expression
 from src._ast import AbstractSyntaxTree as AST
 from src.utils.structures.tree_node import TreeNode
 from src._dir_dfa import DirectDeterministicFiniteAutomaton as DirDFA
-from src.analyzer_serializer import generate_script
+from src.analyzer_serializer import generate_script, generate_standalone_script
+from src._actions import Actions
+from src.build_cache import cache_key, load_cached, store_cached
 
 
-def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, draw_automatons: bool):
+def build_fragment(pieces: list[tuple[bool, str]], subtreesDict: dict, fragments: dict) -> AST:
+    '''
+    Returns the AST of a definition given as (is reference, text) pieces, parsing each distinct definition once.
+    The referenced idents are spliced as the trees already built for them, as if they were between parentheses.
+    '''
+    key = tuple(pieces)
+    this_ast = fragments.get(key)
+    if this_ast is None:
+        this_expression: Expression = Expression()
+        this_expression.hardProcessPieces(
+            [subtreesDict[text] if reference else text for reference, text in pieces])
+        this_ast = AST(this_expression.infixRegEx)
+        fragments[key] = this_ast
+    return this_ast
+
+
+def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, draw_automatons: bool, use_cache: bool = True):
 
     fileContent = readFile(file_path)
     print(f'✔ File read successfully from {file_path}')
 
+    # Drawing needs the trees and automatons of every step, so it always builds
+    use_cache = use_cache and not (draw_subtrees or draw_tree or draw_automatons)
+    if use_cache:
+        key = cache_key(fileContent)
+        final_dir_dfa = load_cached(key)
+        if final_dir_dfa is not None:
+            print(f'✔ Final DIR DFA has been loaded from the build cache ({key[:12]})')
+            return write_outputs(final_dir_dfa, dir_name)
+
     lexer = Tokenizer(fileContent)
     lexer.addPatterns([COMMENT, WS, ID, EQ, EXPR, RETURN])
     lexer.tokenize()
@@ -70,11 +97,11 @@ def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, d
         print('✔ Subtrees drawing skipped, as per user request')
 
     subtreesDict: dict[TreeNode] = {}
+    fragments: dict[tuple, AST] = {}
     if len(yal_let.idents) != 0:
         for idx, ident in enumerate(yal_let.idents.keys()):
-            this_expression: Expression = Expression(yal_let.idents[ident])
-            this_expression.hardProcess()
-            this_ast: AST = AST(this_expression.infixRegEx)
+            this_ast: AST = build_fragment(
+                yal_let.definitions[ident], subtreesDict, fragments)
             subtreesDict[ident] = this_ast
             if draw_subtrees:
                 this_ast.draw(ident, dir_name, ident, False)
@@ -137,6 +164,7 @@ def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, d
     }
 
     returnDict = {}
+    used: set[AST] = set()
     idCounter = 0
     returnCounter = 0
     specialNamingCounter = 1
@@ -149,17 +177,20 @@ def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, d
 
         elif symbol.type == RETURN.name:
             returnCounter += 1
-            last.root = TreeNode(CONCAT, TreeNode(
-                f'#{last_symbol}'), last.root)
+            # A let used by several rules is copied, each position must appear once in the tree
+            subtree = last.root.deepCopy() if last in used else last.root
+            used.add(last)
+            rule_root = TreeNode(CONCAT, TreeNode(
+                f'#{last_symbol}'), subtree)
             alphabet = alphabet.union(set(last.alphabet))
             alphabet.add(f'#{last_symbol}')
 
             returnDict[last_symbol] = symbol.original
 
             if left is None:
-                left = last.root
+                left = rule_root
             else:
-                left.right = last.root
+                left.right = rule_root
 
         elif symbol.type == EXPR.name:
             if symbol.original == OR:
@@ -169,10 +200,8 @@ def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, d
             else:
                 idCounter += 1
 
-                this_expression: Expression = Expression(symbol.original)
-
-                this_expression.hardProcess()
-                this_ast: AST = AST(this_expression.infixRegEx)
+                this_ast: AST = build_fragment(
+                    [(False, symbol.original)], subtreesDict, fragments)
                 last = this_ast
 
                 # Check the symbol.original is a special case else name as tokena, tokenb, ...
@@ -193,7 +222,7 @@ def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, d
 
     final_ast: AST = AST(' ')
     final_ast.root = root
-    final_ast.alphabet = sorted(list(alphabet))
+    final_ast.alphabet = sorted(list(alphabet), key=str)
 
     if final_ast.errorsManager.haveErrors():
         final_ast.errorsManager.printErrors('✖ Final AST building failed')
@@ -206,14 +235,32 @@ def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, d
 
     print('✔ Final AST has been completed successfully')
 
-    final_dir_dfa = DirDFA(final_ast.root.deepCopy())
+    final_dir_dfa = DirDFA(final_ast.root)
     final_dir_dfa.returnDict = returnDict
+    states_before = len(final_dir_dfa.states)
+    final_dir_dfa.minimize()
+    print(
+        f'✔ Final DIR DFA has been minimized from {states_before} to {len(final_dir_dfa.states)} states')
+    final_dir_dfa.actions = Actions(returnDict)
+    if final_dir_dfa.actions.errorsManager.haveErrors():
+        final_dir_dfa.actions.errorsManager.printErrors(
+            '✖ Some RETURN codes could not be compiled')
+    else:
+        print('✔ RETURN codes have been compiled successfully')
     if draw_automatons:
         final_dir_dfa.draw('final_dir_dfa', dir_name, 'Final DIR DFA')
         print('✔ Final DIR DFA has been drawn successfully')
 
     print('✔ Final DIR DFA has been completed successfully')
 
+    if use_cache and not final_dir_dfa.actions.errorsManager.haveErrors():
+        store_cached(key, final_dir_dfa)
+
+    return write_outputs(final_dir_dfa, dir_name)
+
+
+def write_outputs(final_dir_dfa: DirDFA, dir_name: str):
+
     print('-' * 10, 'IMPORTANT', '-' * 10)
     save_as = save_to_pickle(final_dir_dfa, directory=dir_name,
                              file_name='YALEX_ANALYZER', structure_name='Final DIR DFA')
@@ -223,6 +270,11 @@ def yalex(file_path: str, dir_name: str, draw_subtrees: bool, draw_tree: bool, d
 
     print(f'✔ Analyzer Script has been generated successfully to {save_as}')
 
+    save_as = generate_standalone_script(final_dir_dfa,
+                                         f'{dir_name}/YALEX_LEXER.py')
+
+    print(f'✔ Standalone Lexer Script has been generated successfully to {save_as}')
+
     print('-'*31)
 
     print('✔ All Done!')
@@ -245,6 +297,9 @@ if __name__ == "__main__":
     parser.add_argument('draw_automatons', type=str2bool,
                         help='A boolean flag to draw the automatons or not.')  # Draw automatons
 
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Build the analyzer even if the build cache has it.')  # Skip the build cache
+
     args = parser.parse_args()
 
     file_path = args.yal_path
@@ -253,6 +308,7 @@ if __name__ == "__main__":
     draw_tree = args.draw_tree
     draw_automatons = args.draw_automatons
 
-    yalex(file_path, dir_name, draw_subtrees, draw_tree, draw_automatons)
+    yalex(file_path, dir_name, draw_subtrees,
+          draw_tree, draw_automatons, not args.no_cache)
 
     print('Exiting...')
@@ -1,7 +1,11 @@
 import argparse
+import os
 import src.YAPAL_TOKENIZER as tokenizer
 from src._yapal_seq import YapalSequencer as yapal_seq
 from src.grammar import Grammar
+from src.parse_table import ParseTable
+from src.lr_parser import LRParser
+from src.utils.tools import save_to_pickle, readChunks
 from yalex import yalex
 
 
@@ -101,6 +105,52 @@ def main():
         print(f"\t[{idx}] {key}: {value}")
         idx += 1
 
+    grammar.compute_follow()
+    print("✔ Follow sets have been computed successfully:")
+    for idx, (key, value) in enumerate(grammar.follow_sets.items()):
+        print(f"\t[{idx}] {key}: {value}")
+
+    table = ParseTable(grammar, ypsq.get_symbols())
+    if table.conflicts:
+        print(f"✖ The grammar is not SLR(1), {len(table.conflicts)} conflicts found:")
+        for idx, conflict in enumerate(table.conflicts):
+            print(f"\t[{idx}] {table.conflict_to_str(conflict)}")
+
+        # The LALR(1) lookaheads are never larger than FOLLOW, over the same states
+        table = ParseTable(grammar, ypsq.get_symbols(), lalr=True)
+        if table.conflicts:
+            print(f"✖ The grammar is not LALR(1), {len(table.conflicts)} conflicts have been resolved as yacc does:")
+            for idx, conflict in enumerate(table.conflicts):
+                print(f"\t[{idx}] {table.conflict_to_str(conflict)}")
+        else:
+            print("✔ The grammar is LALR(1), no conflicts found")
+    else:
+        print("✔ The grammar is SLR(1), no conflicts found")
+
+    print(f"✔ {table.method} table has been built successfully, {len(table.values)} packed entries:")
+    print(table)
+
+    save_to_pickle(table, directory='.', file_name='YAPAL_PARSER',
+                   structure_name=f'{table.method} table')
+
+    print('-'*80)
+    print("PARSING")
+    print('-'*80)
+
+    if not os.path.isfile(args.input_file):
+        print(f"✖ {args.input_file} not found, nothing to parse")
+        return
+
+    # The tokens of the input are lexed while they are parsed
+    parser = LRParser(table, ypsq.get_ignored_tokens())
+    tree = parser.parse(dir_dfa.stream(readChunks(args.input_file)))
+    if parser.errorsManager.haveErrors():
+        parser.errorsManager.printErrors(
+            f"✖ {args.input_file} is not accepted by the grammar")
+    else:
+        print(f"✔ {args.input_file} is accepted by the grammar:")
+        print(f"\t{tree}")
+
 
 if __name__ == "__main__":
     main()